@@ -11,11 +11,23 @@ from typing import Optional, List, Dict, Any, Callable, Tuple
 from datetime import datetime
 
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.helpers import generate_random_long
+from telethon.tl.functions.messages import SendMessageRequest
 from telethon.tl.types import User, Chat, Channel, Message, Dialog
 from telethon.utils import get_display_name
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of Telegram RPCs in flight at once
+MAX_CONCURRENT_RPCS = 10
+
+# Telegram serves files in parts; 512 KiB is the maximum part size
+DOWNLOAD_PART_SIZE = 512 * 1024
+
+# Files smaller than this are downloaded with a single worker
+PARALLEL_DOWNLOAD_THRESHOLD = 1024 * 1024
+
 
 class TelegramApiClient:
     """Client for interacting with the Telegram API."""
@@ -33,7 +45,32 @@ class TelegramApiClient:
         self.api_hash = api_hash
         self.client = TelegramClient(session_file, api_id, api_hash)
         self._me = None
-        
+        self._me_id = None
+        self._me_lock = asyncio.Lock()
+        self._rpc_sem = asyncio.Semaphore(MAX_CONCURRENT_RPCS)
+
+    async def _with_flood_retry(self, coro_factory: Callable):
+        """Run an RPC under the concurrency limit, retrying on FLOOD_WAIT.
+
+        Bursts of unthrottled calls trip Telegram's flood protection and
+        stall for minutes; the semaphore keeps concurrency below the
+        per-account ceiling and FloodWaitError is retried after the
+        server-advertised delay.
+
+        Args:
+            coro_factory: Zero-argument callable returning the coroutine
+                to await (a fresh coroutine is needed per retry)
+        """
+        while True:
+            try:
+                async with self._rpc_sem:
+                    return await coro_factory()
+            except FloodWaitError as e:
+                logger.warning(
+                    f"FLOOD_WAIT for {e.seconds}s; sleeping before retry"
+                )
+                await asyncio.sleep(e.seconds + 1)
+
     async def connect(self) -> bool:
         """Connect to the Telegram API.
         
@@ -42,6 +79,9 @@ class TelegramApiClient:
         """
         try:
             await self.client.connect()
+            # Warm the get_me cache so later callers hit the fast path
+            if await self.client.is_user_authorized():
+                await self.ensure_me()
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Telegram: {e}")
@@ -95,13 +135,34 @@ class TelegramApiClient:
     
     async def get_me(self) -> Optional[User]:
         """Get the current user.
-        
+
         Returns:
             User: Current user object
         """
         if not self._me:
-            self._me = await self.client.get_me()
+            await self.ensure_me()
+        return self._me
+
+    async def ensure_me(self) -> Optional[User]:
+        """Populate the cached current user and its ID.
+
+        Uses a lock so concurrent callers don't race and issue
+        duplicate get_me RPCs.
+
+        Returns:
+            User: Current user object
+        """
+        async with self._me_lock:
+            if not self._me:
+                self._me = await self.client.get_me()
+                if self._me:
+                    self._me_id = self._me.id
         return self._me
+
+    @property
+    def my_id(self) -> Optional[int]:
+        """ID of the current user, or None if not yet fetched."""
+        return self._me_id
     
     async def get_dialogs(self, limit: int = 100) -> List[Dialog]:
         """Get dialogs (chats) from Telegram.
@@ -128,11 +189,34 @@ class TelegramApiClient:
             Any: Entity object (User, Chat, or Channel)
         """
         try:
-            return await self.client.get_entity(entity_id)
+            return await self._with_flood_retry(
+                lambda: self.client.get_entity(entity_id)
+            )
         except Exception as e:
             logger.error(f"Failed to get entity: {e}")
             return None
     
+    async def get_entities(self, entity_ids: List[Any]) -> List[Any]:
+        """Get several entities from Telegram in one round trip.
+
+        Telethon's get_entity accepts a list and batches the lookup into
+        a single users.getUsers/channels.getChannels call, instead of
+        one RPC per entity.
+
+        Args:
+            entity_ids: IDs of the entities to retrieve
+
+        Returns:
+            List[Any]: Entity objects, in input order
+        """
+        try:
+            return await self._with_flood_retry(
+                lambda: self.client.get_entity(entity_ids)
+            )
+        except Exception as e:
+            logger.error(f"Failed to get entities: {e}")
+            return []
+
     async def get_messages(self, entity: Any, limit: int = 100, ids: List[int] = None) -> List[Message]:
         """Get messages from a chat.
 
@@ -146,8 +230,12 @@ class TelegramApiClient:
         """
         try:
             if ids:
-                return await self.client.get_messages(entity, ids=ids)
-            return await self.client.get_messages(entity, limit=limit)
+                return await self._with_flood_retry(
+                    lambda: self.client.get_messages(entity, ids=ids)
+                )
+            return await self._with_flood_retry(
+                lambda: self.client.get_messages(entity, limit=limit)
+            )
         except Exception as e:
             logger.error(f"Failed to get messages: {e}")
             return []
@@ -171,21 +259,163 @@ class TelegramApiClient:
         except Exception as e:
             logger.error(f"Failed to iterate messages: {e}")
 
-    async def download_media(self, message: Message, file: str = None) -> Optional[str]:
+    async def iter_all_messages_batched(self, entity: Any, batch_size: int = 500,
+                                        min_id: int = 0):
+        """Iterate through all messages in a chat, yielding fixed-size batches.
+
+        Batches let consumers write messages to the database in bulk
+        (one transaction per batch) instead of once per message.
+
+        Args:
+            entity: Chat entity
+            batch_size: Number of messages per yielded batch
+            min_id: Only fetch messages with ID greater than this
+
+        Yields:
+            List[Message]: Batches of messages, the last possibly short
+        """
+        batch = []
+        async for message in self.iter_all_messages(entity, limit=None, min_id=min_id):
+            batch.append(message)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def iter_message_batches(self, entity: Any, batch_size: int = 200,
+                                   min_id: int = 0, limit: int = None):
+        """Iterate message batches with the next fetch always in flight.
+
+        While the consumer processes one batch, the request for the next
+        page is already running, so per-page round-trip time is hidden
+        behind processing/DB time instead of adding to it. Consumers get
+        a whole page per await and can walk it with a plain for loop,
+        one suspension point per page instead of per message.
+
+        Args:
+            entity: Chat entity
+            batch_size: Number of messages per page
+            min_id: Only fetch messages with ID greater than this
+            limit: Maximum total messages to yield (None for all)
+
+        Yields:
+            List[Message]: Pages of messages, newest first
+        """
+        offset_id = 0
+        remaining = limit
+        first_size = batch_size if limit is None else min(batch_size, limit)
+        next_task = asyncio.create_task(
+            self._get_history_page(entity, first_size, min_id, offset_id)
+        )
+        try:
+            while True:
+                batch = await next_task
+                next_task = None
+                if not batch:
+                    break
+                if remaining is not None:
+                    batch = batch[:remaining]
+                    remaining -= len(batch)
+                offset_id = batch[-1].id
+                if remaining is None or remaining > 0:
+                    page_size = batch_size if remaining is None else min(batch_size, remaining)
+                    next_task = asyncio.create_task(
+                        self._get_history_page(entity, page_size, min_id, offset_id)
+                    )
+                yield batch
+                if next_task is None:
+                    break
+        finally:
+            if next_task is not None:
+                next_task.cancel()
+
+    async def _get_history_page(self, entity: Any, batch_size: int,
+                                min_id: int, offset_id: int) -> List[Message]:
+        """Fetch one page of chat history for the prefetching iterator."""
+        try:
+            return await self._with_flood_retry(
+                lambda: self.client.get_messages(
+                    entity, limit=batch_size, min_id=min_id, offset_id=offset_id
+                )
+            )
+        except Exception as e:
+            logger.error(f"Failed to get history page: {e}")
+            return []
+
+    async def download_media(self, message: Message, file: str = None,
+                             workers: int = 4) -> Optional[str]:
         """Download media from a message.
 
+        Large files are split into part-aligned ranges fetched by several
+        concurrent workers, so the download saturates the connection
+        instead of waiting one round trip per part. Small files and
+        downloads without a target path fall back to Telethon's
+        single-stream downloader. Keep workers modest (default 4) to
+        avoid FLOOD_WAIT from the Telegram DC.
+
         Args:
             message: Message containing media
             file: Optional file path to save to
+            workers: Number of concurrent range downloads for large files
 
         Returns:
             str: Path to downloaded file, or None if failed
         """
         try:
-            return await self.client.download_media(message, file=file)
+            size = message.file.size if message.file else None
+            if (not file or not size or workers <= 1
+                    or size < PARALLEL_DOWNLOAD_THRESHOLD):
+                return await self._with_flood_retry(
+                    lambda: self.client.download_media(message, file=file)
+                )
+            return await self._download_file_parallel(message, file, size, workers)
         except Exception as e:
             logger.error(f"Failed to download media: {e}")
             return None
+
+    async def _download_file_parallel(self, message: Message, file: str,
+                                      size: int, workers: int) -> str:
+        """Download a file by fetching part-aligned ranges concurrently."""
+        total_parts = (size + DOWNLOAD_PART_SIZE - 1) // DOWNLOAD_PART_SIZE
+        parts_per_worker = (total_parts + workers - 1) // workers
+        span = parts_per_worker * DOWNLOAD_PART_SIZE
+
+        fd = os.open(file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            tasks = []
+            offset = 0
+            while offset < size:
+                length = min(span, size - offset)
+                tasks.append(self._download_range(message, fd, offset, length))
+                offset += span
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave a half-written file behind
+            try:
+                os.unlink(file)
+            except OSError:
+                pass
+            raise
+        finally:
+            os.close(fd)
+        return file
+
+    async def _download_range(self, message: Message, fd: int,
+                              offset: int, length: int) -> None:
+        """Fetch one part-aligned byte range and write it in place."""
+        parts = (length + DOWNLOAD_PART_SIZE - 1) // DOWNLOAD_PART_SIZE
+        pos = offset
+        remaining = length
+        async for chunk in self.client.iter_download(
+            message, offset=offset, request_size=DOWNLOAD_PART_SIZE, limit=parts
+        ):
+            data = chunk[:remaining]
+            os.pwrite(fd, data, pos)
+            pos += len(data)
+            remaining -= len(data)
+            if remaining <= 0:
+                break
     
     async def send_message(self, entity: Any, message: str) -> Optional[Message]:
         """Send a message to a chat.
@@ -198,11 +428,44 @@ class TelegramApiClient:
             Message: Sent message object
         """
         try:
-            return await self.client.send_message(entity, message)
+            return await self._with_flood_retry(
+                lambda: self.client.send_message(entity, message)
+            )
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
             return None
     
+    async def send_messages(self, entity: Any, texts: List[str]) -> Optional[List[Any]]:
+        """Send several messages to one chat as a pipelined burst.
+
+        Invoking the raw requests as an ordered list lets Telethon chain
+        them server-side (invokeAfterMsgs), so the burst costs roughly
+        one round trip instead of one per message.
+
+        Args:
+            entity: Chat entity
+            texts: Message texts to send, in order
+
+        Returns:
+            List of updates from the server, or None if the burst failed
+        """
+        if not texts:
+            return []
+        try:
+            peer = await self.client.get_input_entity(entity)
+            requests = [
+                SendMessageRequest(
+                    peer=peer, message=text, random_id=generate_random_long()
+                )
+                for text in texts
+            ]
+            return await self._with_flood_retry(
+                lambda: self.client(requests, ordered=True)
+            )
+        except Exception as e:
+            logger.error(f"Failed to send messages: {e}")
+            return None
+
     def add_event_handler(self, callback: Callable, event: Any) -> None:
         """Add an event handler.
         
@@ -215,14 +478,18 @@ class TelegramApiClient:
     async def disconnect(self) -> None:
         """Disconnect from the Telegram API."""
         await self.client.disconnect()
-        
-    def __del__(self):
-        """Cleanup when the client is deleted."""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                loop.create_task(self.disconnect())
-            else:
-                loop.run_until_complete(self.disconnect())
-        except:
-            pass
\ No newline at end of file
+
+    async def __aenter__(self) -> "TelegramApiClient":
+        """Connect and warm caches when entering an async context.
+
+        The underlying MTProto connection is expensive to establish, so
+        callers should hold a single instance for the whole application
+        lifetime rather than creating one per request.
+        """
+        await self.connect()
+        await self.ensure_me()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Disconnect when leaving the async context."""
+        await self.disconnect()
\ No newline at end of file
@@ -5,11 +5,15 @@ Handles common operations between the application and Telegram API such as
 authentication, error handling, and entity type conversion.
 """
 
+import asyncio
 import logging
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, Tuple, List, Callable
 from datetime import datetime
 from functools import wraps
 
+from telethon.errors import RPCError
 from telethon.tl.types import (
     User, Chat, Channel, Message, Dialog,
     MessageMediaPhoto, MessageMediaDocument, MessageMediaWebPage,
@@ -23,13 +27,162 @@ from api.client import TelegramApiClient
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class MessageRow:
+    """Compact processed-message record.
+
+    Slotted fields replace the per-message dict that used to flow from
+    process_message to storage: no hash table per row, attribute access
+    instead of key lookups on the million-row sync path.
+    """
+    id: int
+    chat_id: int
+    chat_title: str
+    sender_id: int
+    sender_name: str
+    content: str
+    timestamp: int
+    is_from_me: bool
+    has_media: bool = False
+    media_type: Optional[str] = None
+    file_id: Optional[str] = None
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    mime_type: Optional[str] = None
+
+
+# Static lookup tables, built once at import instead of per message
+_MIME_TO_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "video/mp4": ".mp4",
+    "video/quicktime": ".mov",
+    "audio/mpeg": ".mp3",
+    "audio/ogg": ".ogg",
+    "application/pdf": ".pdf",
+    "application/zip": ".zip",
+}
+
+_MIME_PREFIX_TO_TYPE = (
+    ("image/", "document_image"),
+    ("video/", "video"),
+    ("audio/", "audio"),
+)
+
+
+def _get_extension_from_mime(mime_type: Optional[str]) -> str:
+    """Get file extension from mime type."""
+    return _MIME_TO_EXT.get(mime_type or "", "")
+
+
+def _handle_photo_media(media, message_id: int, result: Dict[str, Any]) -> None:
+    """Fill media info for a photo."""
+    result["has_media"] = True
+    result["media_type"] = "photo"
+    if media.photo:
+        result["file_id"] = str(media.photo.id)
+        # Photos don't have a direct file size in the photo object
+        # Size is in the largest PhotoSize
+        best = 0
+        for s in media.photo.sizes:
+            sz = getattr(s, 'size', 0) or 0
+            if sz > best:
+                best = sz
+        result["file_size"] = best or None
+    result["mime_type"] = "image/jpeg"
+    result["file_name"] = f"photo_{message_id}.jpg"
+
+
+def _handle_document_media(media, message_id: int, result: Dict[str, Any]) -> None:
+    """Fill media info for a document (file, video, audio, sticker...)."""
+    result["has_media"] = True
+    doc = media.document
+    if not doc:
+        return
+
+    result["file_id"] = str(doc.id)
+    result["file_size"] = doc.size
+    result["mime_type"] = doc.mime_type
+
+    # Determine media type and filename from attributes
+    for attr in doc.attributes:
+        attr_handler = _ATTR_HANDLERS.get(type(attr))
+        if attr_handler:
+            attr_handler(attr, result)
+
+    # Default media type based on mime type if not set
+    if not result["media_type"]:
+        mime = doc.mime_type or ""
+        for prefix, media_type in _MIME_PREFIX_TO_TYPE:
+            if mime.startswith(prefix):
+                result["media_type"] = media_type
+                break
+        else:
+            result["media_type"] = "document"
+
+    # Generate filename if not found
+    if not result["file_name"]:
+        ext = _get_extension_from_mime(doc.mime_type)
+        result["file_name"] = f"{result['media_type']}_{message_id}{ext}"
+
+
+def _handle_webpage_media(media, message_id: int, result: Dict[str, Any]) -> None:
+    """Web page previews are not downloadable attachments."""
+
+
+def _attr_filename(attr, result: Dict[str, Any]) -> None:
+    result["file_name"] = attr.file_name
+
+
+def _attr_audio(attr, result: Dict[str, Any]) -> None:
+    result["media_type"] = "voice" if attr.voice else "audio"
+
+
+def _attr_video(attr, result: Dict[str, Any]) -> None:
+    result["media_type"] = "video_note" if attr.round_message else "video"
+
+
+def _attr_sticker(attr, result: Dict[str, Any]) -> None:
+    result["media_type"] = "sticker"
+
+
+def _attr_animated(attr, result: Dict[str, Any]) -> None:
+    result["media_type"] = "animation"
+
+
+# Dispatch tables replacing per-message isinstance chains: one dict
+# lookup on the concrete Telethon type instead of O(types) checks.
+_MEDIA_HANDLERS = {
+    MessageMediaPhoto: _handle_photo_media,
+    MessageMediaDocument: _handle_document_media,
+    MessageMediaWebPage: _handle_webpage_media,
+}
+
+# Maximum number of chat-entity dicts cached per middleware instance
+_CHAT_CACHE_SIZE = 10000
+
+_ATTR_HANDLERS = {
+    DocumentAttributeFilename: _attr_filename,
+    DocumentAttributeAudio: _attr_audio,
+    DocumentAttributeVideo: _attr_video,
+    DocumentAttributeSticker: _attr_sticker,
+    DocumentAttributeAnimated: _attr_animated,
+}
+
+
 def handle_telegram_errors(func):
-    """Decorator to handle Telegram API errors."""
+    """Decorator to handle Telegram API errors.
+
+    Only Telegram RPC failures are swallowed; programming errors
+    propagate instead of being silently turned into None.
+    """
     @wraps(func)
     async def wrapper(*args, **kwargs):
         try:
             return await func(*args, **kwargs)
-        except Exception as e:
+        except RPCError as e:
             logger.error(f"Telegram API error in {func.__name__}: {e}")
             return None
     return wrapper
@@ -45,16 +198,66 @@ class TelegramMiddleware:
             client: Initialized Telegram API client
         """
         self.client = client
-        
-    async def process_chat_entity(self, entity: Any) -> Dict[str, Any]:
+        self._my_id: Optional[int] = None
+        # LRU cache of processed chat entities; thousands of messages in
+        # one sync share the same handful of chats
+        self._chat_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+
+    async def _ensure_my_id(self) -> int:
+        """Get the current user's ID, fetching it from Telegram only once."""
+        if self._my_id is None:
+            # Fast path: the client caches its own ID at connect time
+            if self.client.my_id is not None:
+                self._my_id = self.client.my_id
+            else:
+                self._my_id = (await self.client.get_me()).id
+        return self._my_id
+
+    async def process_messages(self, messages: List[Message]) -> List[Optional[MessageRow]]:
+        """Process a batch of messages concurrently.
+
+        Runs per-message processing (including sender resolution) via
+        asyncio.gather so network round-trips overlap instead of
+        serializing one RTT per message.
+
+        Args:
+            messages: Messages from Telegram API
+
+        Returns:
+            List of standardized message representations (None entries
+            for messages that could not be processed)
+        """
+        return await asyncio.gather(*(self.process_message(m) for m in messages))
+
+    def process_dialogs(self, dialogs: List[Dialog]) -> List[Optional[Dict[str, Any]]]:
+        """Process a batch of dialogs.
+
+        Args:
+            dialogs: Dialogs from Telegram API
+
+        Returns:
+            List of standardized dialog representations
+        """
+        return [self.process_dialog(d) for d in dialogs]
+
+    def process_chat_entity(self, entity: Any) -> Dict[str, Any]:
         """Process a chat entity and convert it to a dictionary.
-        
+
+        Plain function on purpose: the work is pure attribute
+        inspection, so callers in per-message loops skip the coroutine
+        construction and scheduling an async def would cost.
+
         Args:
             entity: Chat entity from Telegram API
-            
+
         Returns:
             Dict: Standardized chat representation
         """
+        cached = self._chat_cache.get(entity.id)
+        if cached is not None:
+            self._chat_cache.move_to_end(entity.id)
+            return dict(cached)
+
         if isinstance(entity, User):
             chat_type = "user"
             title = get_display_name(entity)
@@ -70,37 +273,42 @@ class TelegramMiddleware:
         else:
             logger.warning(f"Unknown chat type: {type(entity)}")
             return {}
-            
-        return {
+
+        chat_info = {
             "id": entity.id,
             "title": title,
             "username": username,
             "type": chat_type
         }
+
+        self._chat_cache[entity.id] = dict(chat_info)
+        if len(self._chat_cache) > _CHAT_CACHE_SIZE:
+            self._chat_cache.popitem(last=False)
+
+        return chat_info
         
-    @handle_telegram_errors
-    async def process_dialog(self, dialog: Dialog) -> Dict[str, Any]:
+    def process_dialog(self, dialog: Dialog) -> Dict[str, Any]:
         """Process a dialog and convert it to a dictionary.
-        
+
         Args:
             dialog: Dialog from Telegram API
-            
+
         Returns:
             Dict: Standardized dialog representation
         """
-        chat_info = await self.process_chat_entity(dialog.entity)
+        chat_info = self.process_chat_entity(dialog.entity)
         chat_info["last_message_time"] = dialog.date
         return chat_info
         
     @handle_telegram_errors
-    async def process_message(self, message: Message) -> Optional[Dict[str, Any]]:
-        """Process a message and convert it to a dictionary.
+    async def process_message(self, message: Message) -> Optional[MessageRow]:
+        """Process a message into a compact row record.
 
         Args:
             message: Message from Telegram API
 
         Returns:
-            Dict: Standardized message representation
+            MessageRow: Standardized message representation
         """
         # Get the chat
         chat = message.chat
@@ -114,7 +322,7 @@ class TelegramMiddleware:
         if not message.text and not media_info["has_media"]:
             return None
 
-        chat_info = await self.process_chat_entity(chat)
+        chat_info = self.process_chat_entity(chat)
 
         # Get sender information
         sender = await message.get_sender()
@@ -122,20 +330,72 @@ class TelegramMiddleware:
         sender_name = get_display_name(sender) if sender else "Unknown"
 
         # Check if the message is from the current user
-        my_id = (await self.client.get_me()).id
+        my_id = await self._ensure_my_id()
         is_from_me = sender_id == my_id
 
-        return {
-            "id": message.id,
-            "chat_id": chat_info["id"],
-            "chat_title": chat_info["title"],
-            "sender_id": sender_id,
-            "sender_name": sender_name,
-            "content": message.text or "",
-            "timestamp": message.date,
-            "is_from_me": is_from_me,
+        return MessageRow(
+            id=message.id,
+            chat_id=chat_info["id"],
+            chat_title=chat_info["title"],
+            sender_id=sender_id,
+            sender_name=sender_name,
+            content=message.text or "",
+            timestamp=int(message.date.timestamp()),
+            is_from_me=is_from_me,
             **media_info
-        }
+        )
+
+    def can_process_sync(self, message: Message) -> bool:
+        """Whether process_message_sync can handle this message.
+
+        True once our own ID is known and the sender is already cached
+        on the message (or the message has no sender at all), i.e. no
+        network round trip would be needed.
+        """
+        return self._my_id is not None and (
+            message.sender is not None or message.sender_id is None
+        )
+
+    def process_message_sync(self, message: Message) -> Optional[MessageRow]:
+        """Synchronous variant of process_message for executor offload.
+
+        Media parsing and entity conversion are pure CPU work; running
+        them off the event loop keeps Telethon fetches flowing while a
+        batch is decoded. Callers must check can_process_sync first and
+        fall back to process_message when it is False.
+
+        Args:
+            message: Message from Telegram API
+
+        Returns:
+            MessageRow: Standardized message representation
+        """
+        chat = message.chat
+        if not chat:
+            return None
+
+        media_info = self._extract_media_info(message)
+
+        if not message.text and not media_info["has_media"]:
+            return None
+
+        chat_info = self.process_chat_entity(chat)
+
+        sender = message.sender
+        sender_id = sender.id if sender else 0
+        sender_name = get_display_name(sender) if sender else "Unknown"
+
+        return MessageRow(
+            id=message.id,
+            chat_id=chat_info["id"],
+            chat_title=chat_info["title"],
+            sender_id=sender_id,
+            sender_name=sender_name,
+            content=message.text or "",
+            timestamp=int(message.date.timestamp()),
+            is_from_me=sender_id == self._my_id,
+            **media_info
+        )
 
     def _extract_media_info(self, message: Message) -> Dict[str, Any]:
         """Extract media information from a message.
@@ -155,92 +415,16 @@ class TelegramMiddleware:
             "mime_type": None,
         }
 
-        if not message.media:
-            return result
-
         media = message.media
-
-        if isinstance(media, MessageMediaPhoto):
-            result["has_media"] = True
-            result["media_type"] = "photo"
-            if media.photo:
-                result["file_id"] = str(media.photo.id)
-                # Photos don't have a direct file size in the photo object
-                # Size is in the largest PhotoSize
-                if hasattr(media.photo, 'sizes') and media.photo.sizes:
-                    largest = max(media.photo.sizes, key=lambda s: getattr(s, 'size', 0) if hasattr(s, 'size') else 0)
-                    result["file_size"] = getattr(largest, 'size', None)
-            result["mime_type"] = "image/jpeg"
-            result["file_name"] = f"photo_{message.id}.jpg"
-
-        elif isinstance(media, MessageMediaDocument):
-            result["has_media"] = True
-            doc = media.document
-            if doc:
-                result["file_id"] = str(doc.id)
-                result["file_size"] = doc.size
-                result["mime_type"] = doc.mime_type
-
-                # Determine media type and filename from attributes
-                for attr in doc.attributes:
-                    if isinstance(attr, DocumentAttributeFilename):
-                        result["file_name"] = attr.file_name
-                    elif isinstance(attr, DocumentAttributeAudio):
-                        if attr.voice:
-                            result["media_type"] = "voice"
-                        else:
-                            result["media_type"] = "audio"
-                    elif isinstance(attr, DocumentAttributeVideo):
-                        if attr.round_message:
-                            result["media_type"] = "video_note"
-                        else:
-                            result["media_type"] = "video"
-                    elif isinstance(attr, DocumentAttributeSticker):
-                        result["media_type"] = "sticker"
-                    elif isinstance(attr, DocumentAttributeAnimated):
-                        result["media_type"] = "animation"
-
-                # Default media type based on mime type if not set
-                if not result["media_type"]:
-                    mime = doc.mime_type or ""
-                    if mime.startswith("image/"):
-                        result["media_type"] = "document_image"
-                    elif mime.startswith("video/"):
-                        result["media_type"] = "video"
-                    elif mime.startswith("audio/"):
-                        result["media_type"] = "audio"
-                    else:
-                        result["media_type"] = "document"
-
-                # Generate filename if not found
-                if not result["file_name"]:
-                    ext = self._get_extension_from_mime(doc.mime_type)
-                    result["file_name"] = f"{result['media_type']}_{message.id}{ext}"
-
-        elif isinstance(media, MessageMediaWebPage):
-            # Web page previews - not a downloadable attachment
+        if not media:
             return result
 
+        handler = _MEDIA_HANDLERS.get(type(media))
+        if handler:
+            handler(media, message.id, result)
+
         return result
 
-    def _get_extension_from_mime(self, mime_type: Optional[str]) -> str:
-        """Get file extension from mime type."""
-        if not mime_type:
-            return ""
-        mime_to_ext = {
-            "image/jpeg": ".jpg",
-            "image/png": ".png",
-            "image/gif": ".gif",
-            "image/webp": ".webp",
-            "video/mp4": ".mp4",
-            "video/quicktime": ".mov",
-            "audio/mpeg": ".mp3",
-            "audio/ogg": ".ogg",
-            "application/pdf": ".pdf",
-            "application/zip": ".zip",
-        }
-        return mime_to_ext.get(mime_type, "")
-        
     @handle_telegram_errors
     async def find_entity_by_name_or_id(self, recipient: str) -> Optional[Any]:
         """Find an entity by name or ID.
@@ -251,19 +435,58 @@ class TelegramMiddleware:
         Returns:
             Any: Found entity or None
         """
-        # Try to parse as an integer (chat ID)
-        try:
-            chat_id = int(recipient)
-            return await self.client.get_entity(chat_id)
-        except ValueError:
-            pass
-            
+        # Numeric chat ID fast path — avoids raising ValueError per call
+        if recipient.lstrip("-").isdigit():
+            return await self.client.get_entity(int(recipient))
+
         # Not an integer, try as username
         if recipient.startswith("@"):
             recipient = recipient[1:]  # Remove @ if present
-            
+
         try:
             return await self.client.get_entity(recipient)
         except Exception:
             logger.error(f"Could not find entity: {recipient}")
-            return None
\ No newline at end of file
+            return None
+
+    @handle_telegram_errors
+    async def find_entities_by_names_or_ids(
+        self, recipients: List[str]
+    ) -> List[Optional[Any]]:
+        """Find several entities by name or ID in as few RPCs as possible.
+
+        Numeric IDs are resolved together in one bulk lookup; username
+        lookups still need one request each but are issued concurrently.
+
+        Args:
+            recipients: Recipient identifiers (IDs, usernames, or titles)
+
+        Returns:
+            List of found entities (None entries for misses), in input order
+        """
+        results: List[Optional[Any]] = [None] * len(recipients)
+
+        numeric_positions = []
+        numeric_ids = []
+        name_positions = []
+        for i, recipient in enumerate(recipients):
+            if recipient.lstrip("-").isdigit():
+                numeric_positions.append(i)
+                numeric_ids.append(int(recipient))
+            else:
+                name_positions.append(i)
+
+        if numeric_ids:
+            entities = await self.client.get_entities(numeric_ids)
+            for pos, entity in zip(numeric_positions, entities):
+                results[pos] = entity
+
+        if name_positions:
+            found = await asyncio.gather(*(
+                self.find_entity_by_name_or_id(recipients[pos])
+                for pos in name_positions
+            ))
+            for pos, entity in zip(name_positions, found):
+                results[pos] = entity
+
+        return results
\ No newline at end of file
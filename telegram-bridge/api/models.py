@@ -4,13 +4,15 @@ API models for data transfer.
 Defines Pydantic models for request and response data validation.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, computed_field
 
 
 class ChatModel(BaseModel):
     """Model representing a Telegram chat."""
+    model_config = ConfigDict(frozen=True, extra="forbid", from_attributes=True)
+
     id: int
     title: str
     username: Optional[str] = None
@@ -20,18 +22,28 @@ class ChatModel(BaseModel):
 
 class MessageModel(BaseModel):
     """Model representing a Telegram message."""
+    model_config = ConfigDict(frozen=True, extra="forbid", from_attributes=True)
+
     id: int
     chat_id: int
     chat_title: str
     sender_id: int
     sender_name: str
     content: str
-    timestamp: datetime
+    timestamp: int  # unix epoch seconds
     is_from_me: bool = False
 
+    @computed_field
+    @property
+    def timestamp_iso(self) -> str:
+        """UTC ISO-8601 rendering of the epoch timestamp."""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat()
+
 
 class MessageContextModel(BaseModel):
     """Model representing a message with its context."""
+    model_config = ConfigDict(frozen=True, extra="forbid", from_attributes=True)
+
     message: MessageModel
     before: List[MessageModel] = []
     after: List[MessageModel] = []
@@ -51,10 +63,12 @@ class SendMessageResponse(BaseModel):
 
 class AttachmentModel(BaseModel):
     """Model representing a message attachment."""
+    model_config = ConfigDict(frozen=True, extra="forbid", from_attributes=True)
+
     message_id: int
     chat_id: int
     sender_name: str
-    timestamp: datetime
+    timestamp: int  # unix epoch seconds
     content: Optional[str] = None
     media_type: str
     file_name: Optional[str] = None
@@ -87,4 +101,11 @@ class SyncResponse(BaseModel):
     """Model for sync responses."""
     success: bool
     message: str
-    count: int = 0
\ No newline at end of file
+    count: int = 0
+
+
+# Precompiled list adapters. dump_json serializes a whole list in one
+# pass through Pydantic's compiled core instead of encoding per element.
+ChatListAdapter = TypeAdapter(List[ChatModel])
+MessageListAdapter = TypeAdapter(List[MessageModel])
+AttachmentListAdapter = TypeAdapter(List[AttachmentModel])
@@ -5,7 +5,7 @@ Provides a SQLAlchemy engine and session factory with connection pooling.
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
 
@@ -25,18 +25,83 @@ engine = create_engine(
     max_overflow=10,
     pool_timeout=30,
     pool_recycle=3600,
+    pool_pre_ping=True,
+    insertmanyvalues_page_size=1000,
 )
 
-# Create session factory
-SessionFactory = sessionmaker(bind=engine)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new pooled connection for the read-heavy workload.
+
+    WAL lets readers run during writes, mmap serves hot pages without
+    the pager copy, and the enlarged cache (128 MiB) keeps the message
+    indexes resident.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-131072")
+    cursor.close()
+
+
+# Create session factory. autoflush is off because repositories commit
+# explicitly, and expire_on_commit is off so objects stay readable after
+# commit instead of triggering a re-SELECT per attribute access.
+SessionFactory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 Session = scoped_session(SessionFactory)
 
 
+# Full-text search over message content and chat titles, kept in sync
+# with the base tables via triggers. CREATE ... IF NOT EXISTS keeps
+# this idempotent.
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS chats_fts
+       USING fts5(title, username, content='chats', content_rowid='rowid')""",
+    """CREATE TRIGGER IF NOT EXISTS chats_fts_ai AFTER INSERT ON chats BEGIN
+         INSERT INTO chats_fts(rowid, title, username)
+         VALUES (new.rowid, new.title, new.username);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS chats_fts_ad AFTER DELETE ON chats BEGIN
+         INSERT INTO chats_fts(chats_fts, rowid, title, username)
+         VALUES ('delete', old.rowid, old.title, old.username);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS chats_fts_au AFTER UPDATE ON chats BEGIN
+         INSERT INTO chats_fts(chats_fts, rowid, title, username)
+         VALUES ('delete', old.rowid, old.title, old.username);
+         INSERT INTO chats_fts(rowid, title, username)
+         VALUES (new.rowid, new.title, new.username);
+       END""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+       USING fts5(content, content='messages', content_rowid='rowid')""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+         INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+         INSERT INTO messages_fts(messages_fts, rowid, content)
+         VALUES ('delete', old.rowid, old.content);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+         INSERT INTO messages_fts(messages_fts, rowid, content)
+         VALUES ('delete', old.rowid, old.content);
+         INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+       END""",
+]
+
+
 def init_db():
     """Initialize the database schema."""
     Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for ddl in FTS_DDL:
+            conn.exec_driver_sql(ddl)
 
 
 def get_session():
-    """Get a database session from the pool."""
+    """Get a database session from the pool.
+
+    Use as a context manager (``with get_session() as session:``) so the
+    pooled connection is returned on exit instead of being torn down.
+    """
     return Session()
\ No newline at end of file
@@ -4,7 +4,7 @@ Database models for the Telegram bridge.
 This module defines SQLAlchemy ORM models for storing Telegram chats and messages.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Index, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Index, DateTime, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -40,7 +40,9 @@ class Message(Base):
     sender_id = Column(Integer)
     sender_name = Column(String)
     content = Column(Text)
-    timestamp = Column(DateTime, default=datetime.now)
+    # Unix epoch seconds: fixed-width integer comparisons and index
+    # scans, no per-row datetime parsing on read
+    timestamp = Column(Integer, default=lambda: int(datetime.now().timestamp()))
     is_from_me = Column(Boolean, default=False)
 
     # Media/attachment fields
@@ -55,13 +57,26 @@ class Message(Base):
     # Relationship with chat
     chat = relationship("Chat", back_populates="messages")
 
-    # Indexes for improved query performance
+    @property
+    def chat_title(self):
+        """Title of the owning chat, for attribute-based serialization."""
+        return self.chat.title
+
+    # Indexes for improved query performance.
+    # The composite (chat_id, timestamp) index serves the dominant
+    # "latest N messages in chat X" query as a single range scan.
+    # Content search goes through the messages_fts FTS5 table instead of
+    # a btree index, which could not serve substring queries anyway.
     __table_args__ = (
-        Index("idx_messages_chat_id", "chat_id"),
-        Index("idx_messages_timestamp", "timestamp"),
-        Index("idx_messages_content", "content"),
+        Index("idx_chat_ts", "chat_id", "timestamp"),
+        Index("idx_chat_sender_ts", "chat_id", "sender_id", "timestamp"),
         Index("idx_messages_sender_id", "sender_id"),
-        Index("idx_messages_has_media", "has_media"),
+        # Partial index: only the minority of rows with media are
+        # indexed, pre-sorted for the attachment listing query
+        Index(
+            "idx_messages_media", "chat_id", "media_type",
+            text("timestamp DESC"), sqlite_where=text("has_media = 1"),
+        ),
     )
 
     def __repr__(self):
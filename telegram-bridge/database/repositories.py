@@ -4,14 +4,183 @@ Repository classes for database operations.
 Provides abstraction for data access operations on Telegram chats and messages.
 """
 
+import operator
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy import desc, or_, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import bindparam, desc, func, or_, and_, select, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
 
-from database.base import get_session
+from database.base import engine, get_session
 from database.models import Chat, Message
 
+# Message columns accepted from processed message dicts, in table order
+_MESSAGE_COLUMNS = (
+    "id", "chat_id", "sender_id", "sender_name", "content", "timestamp",
+    "is_from_me", "has_media", "media_type", "file_id", "file_name",
+    "file_size", "mime_type",
+)
+
+# Pulls all message columns off a slotted row record in one call
+_ROW_VALUES = operator.attrgetter(*_MESSAGE_COLUMNS)
+
+
+def _build_message_upsert_sql() -> str:
+    """Construct the message upsert SQL, built once at import.
+
+    Positional placeholders let the bulk paths hand attrgetter tuples
+    straight to the driver's executemany — no per-row dict, no
+    SQLAlchemy parameter processing between the row record and SQLite.
+    local_path is absent from the column list, so it survives conflicts.
+    """
+    cols = ", ".join(_MESSAGE_COLUMNS)
+    placeholders = ", ".join("?" * len(_MESSAGE_COLUMNS))
+    updates = ", ".join(
+        f"{col} = excluded.{col}"
+        for col in _MESSAGE_COLUMNS
+        if col not in ("id", "chat_id")
+    )
+    return (
+        f"INSERT INTO messages ({cols}) VALUES ({placeholders}) "
+        f"ON CONFLICT(id, chat_id) DO UPDATE SET {updates}"
+    )
+
+
+_MESSAGE_UPSERT_SQL = _build_message_upsert_sql()
+
+
+# Context around a message in one round trip: a CTE anchors the target
+# timestamp, then three UNION ALL members fetch the before window, the
+# target itself and the after window. The inner ORDER BY/LIMIT pairs run
+# against idx_chat_ts, so each member is a bounded range scan.
+_CONTEXT_COLUMNS = (
+    "m.id, m.chat_id, c.title AS chat_title, m.sender_id, m.sender_name, "
+    "m.content, m.timestamp, m.is_from_me"
+)
+_CONTEXT_STMT = text(f"""
+    WITH t AS (
+        SELECT timestamp AS ts FROM messages
+        WHERE id = :mid AND chat_id = :cid
+    )
+    SELECT * FROM (
+        SELECT {_CONTEXT_COLUMNS}
+        FROM messages m JOIN chats c ON c.id = m.chat_id
+        WHERE m.chat_id = :cid AND m.timestamp < (SELECT ts FROM t)
+        ORDER BY m.timestamp DESC LIMIT :before
+    )
+    UNION ALL
+    SELECT {_CONTEXT_COLUMNS}
+    FROM messages m JOIN chats c ON c.id = m.chat_id
+    WHERE m.id = :mid AND m.chat_id = :cid
+    UNION ALL
+    SELECT * FROM (
+        SELECT {_CONTEXT_COLUMNS}
+        FROM messages m JOIN chats c ON c.id = m.chat_id
+        WHERE m.chat_id = :cid AND m.timestamp > (SELECT ts FROM t)
+        ORDER BY m.timestamp ASC LIMIT :after
+    )
+""")
+
+
+def _fts_prefix_query(query: str) -> str:
+    """Turn free-form user input into a safe FTS5 prefix query."""
+    return '"' + query.replace('"', '""') + '"*'
+
+
+@lru_cache(maxsize=64)
+def _messages_stmt(has_chat: bool, has_sender: bool, has_query: bool,
+                   has_range: bool, has_cursor: bool = False,
+                   as_rows: bool = False):
+    """Build (once per filter shape) the statement behind get_messages.
+
+    Caching the constructed statement lets SQLAlchemy reuse its compiled
+    SQL instead of rebuilding and recompiling the same query per call.
+    With as_rows the statement selects plain columns (plus the joined
+    chat title) instead of ORM entities, skipping instance construction
+    and identity-map bookkeeping on read-only paths.
+    """
+    if as_rows:
+        stmt = select(
+            Message.id, Message.chat_id, Chat.title.label("chat_title"),
+            Message.sender_id, Message.sender_name, Message.content,
+            Message.timestamp, Message.is_from_me,
+        ).join(Chat, Chat.id == Message.chat_id)
+    else:
+        stmt = select(Message).options(selectinload(Message.chat))
+    if has_chat:
+        stmt = stmt.where(Message.chat_id == bindparam("chat_id"))
+    if has_sender:
+        stmt = stmt.where(Message.sender_id == bindparam("sender_id"))
+    if has_query:
+        # Tokenized FTS5 lookup instead of a full-scan LIKE filter
+        stmt = stmt.where(text(
+            "messages.rowid IN "
+            "(SELECT rowid FROM messages_fts WHERE messages_fts MATCH :query)"
+        ))
+    if has_range:
+        stmt = stmt.where(
+            Message.timestamp >= bindparam("start_ts"),
+            Message.timestamp <= bindparam("end_ts"),
+        )
+    if has_cursor:
+        # Keyset pagination: resume strictly after the last seen row via
+        # a row-value comparison instead of walking and discarding an
+        # OFFSET prefix — O(limit) however deep the client scrolls.
+        stmt = stmt.where(
+            tuple_(Message.timestamp, Message.id)
+            < tuple_(bindparam("cursor_ts"), bindparam("cursor_id"))
+        )
+    stmt = stmt.order_by(desc(Message.timestamp), desc(Message.id))
+    stmt = stmt.limit(bindparam("limit"))
+    if not has_cursor:
+        stmt = stmt.offset(bindparam("offset"))
+    return stmt
+
+
+@lru_cache(maxsize=8)
+def _attachments_stmt(has_chat: bool, has_type: bool):
+    """Build (once per filter shape) the statement behind attachment reads.
+
+    Selects the columns the attachment listing returns, labelled to
+    match the response dict keys, so rows need no Python reshaping.
+    """
+    stmt = select(
+        Message.id.label("message_id"), Message.chat_id,
+        Message.sender_name, Message.timestamp, Message.content,
+        Message.media_type, Message.file_name, Message.file_size,
+        Message.mime_type, Message.local_path,
+    ).where(Message.has_media == True)
+    if has_chat:
+        stmt = stmt.where(Message.chat_id == bindparam("chat_id"))
+    if has_type:
+        stmt = stmt.where(Message.media_type == bindparam("media_type"))
+    return stmt.order_by(desc(Message.timestamp)).limit(bindparam("limit"))
+
+
+@lru_cache(maxsize=32)
+def _chats_stmt(has_query: bool, has_type: bool, by_time: bool,
+                as_rows: bool = False):
+    """Build (once per filter shape) the statement behind get_chats."""
+    if as_rows:
+        stmt = select(Chat.id, Chat.title, Chat.username, Chat.type,
+                      Chat.last_message_time)
+    else:
+        stmt = select(Chat)
+    if has_query:
+        # Tokenized FTS5 lookup over title and username
+        stmt = stmt.where(text(
+            "chats.rowid IN "
+            "(SELECT rowid FROM chats_fts WHERE chats_fts MATCH :query)"
+        ))
+    if has_type:
+        stmt = stmt.where(Chat.type == bindparam("chat_type"))
+    if by_time:
+        stmt = stmt.order_by(desc(Chat.last_message_time))
+    else:
+        stmt = stmt.order_by(Chat.title)
+    return stmt.limit(bindparam("limit")).offset(bindparam("offset"))
+
 
 class ChatRepository:
     """Repository for chat operations."""
@@ -24,32 +193,42 @@ class ChatRepository:
         chat_type: str,
         last_message_time: datetime,
     ) -> None:
-        """Store a chat in the database."""
-        session = get_session()
-        try:
-            chat = session.query(Chat).filter_by(id=chat_id).first()
-            
-            if chat:
-                # Update existing chat
-                chat.title = title
-                chat.username = username
-                chat.type = chat_type
-                chat.last_message_time = last_message_time
-            else:
-                # Create new chat
-                chat = Chat(
-                    id=chat_id,
-                    title=title,
-                    username=username,
-                    type=chat_type,
-                    last_message_time=last_message_time
-                )
-                session.add(chat)
-                
+        """Store a chat in the database with a single upsert."""
+        self.store_chats_bulk([{
+            "id": chat_id,
+            "title": title,
+            "username": username,
+            "type": chat_type,
+            "last_message_time": last_message_time,
+        }])
+
+    def store_chats_bulk(self, rows: List[Dict[str, Any]]) -> None:
+        """Store several chats with one INSERT ... ON CONFLICT DO UPDATE.
+
+        Collapses the old SELECT + INSERT/UPDATE + commit round trips
+        into a single statement and one commit for the whole batch.
+
+        Args:
+            rows: Chat dicts with id, title, username, type and
+                last_message_time keys
+        """
+        if not rows:
+            return
+
+        stmt = sqlite_insert(Chat).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "title": stmt.excluded.title,
+                "username": stmt.excluded.username,
+                "type": stmt.excluded.type,
+                "last_message_time": stmt.excluded.last_message_time,
+            },
+        )
+        with get_session() as session:
+            session.execute(stmt)
             session.commit()
-        finally:
-            session.close()
-    
+
     def get_chats(
         self,
         query: Optional[str] = None,
@@ -59,43 +238,50 @@ class ChatRepository:
         sort_by: str = "last_message_time"
     ) -> List[Chat]:
         """Get chats from the database."""
-        session = get_session()
-        try:
-            # Build query
-            db_query = session.query(Chat)
-            
-            # Apply filters
-            if query:
-                db_query = db_query.filter(
-                    or_(
-                        Chat.title.ilike(f"%{query}%"),
-                        Chat.username.ilike(f"%{query}%")
-                    )
-                )
-            
-            if chat_type:
-                db_query = db_query.filter(Chat.type == chat_type)
-                
-            # Apply sorting
-            if sort_by == "last_message_time":
-                db_query = db_query.order_by(desc(Chat.last_message_time))
-            else:
-                db_query = db_query.order_by(Chat.title)
-                
-            # Apply pagination
-            db_query = db_query.limit(limit).offset(offset)
-            
-            return db_query.all()
-        finally:
-            session.close()
-    
+        stmt = _chats_stmt(
+            bool(query), bool(chat_type), sort_by == "last_message_time"
+        )
+
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        if query:
+            params["query"] = _fts_prefix_query(query)
+        if chat_type:
+            params["chat_type"] = chat_type
+
+        with get_session() as session:
+            return session.execute(stmt, params).scalars().all()
+
+    def get_chats_rows(
+        self,
+        query: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        chat_type: Optional[str] = None,
+        sort_by: str = "last_message_time"
+    ) -> List[Dict[str, Any]]:
+        """Get chats as plain column mappings.
+
+        Read-only variant of get_chats that skips ORM instance
+        construction; rows unpack directly into response models.
+        """
+        stmt = _chats_stmt(
+            bool(query), bool(chat_type), sort_by == "last_message_time",
+            as_rows=True,
+        )
+
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
+        if query:
+            params["query"] = _fts_prefix_query(query)
+        if chat_type:
+            params["chat_type"] = chat_type
+
+        with get_session() as session:
+            return session.execute(stmt, params).mappings().all()
+
     def get_chat_by_id(self, chat_id: int) -> Optional[Chat]:
         """Get a chat by its ID."""
-        session = get_session()
-        try:
+        with get_session() as session:
             return session.query(Chat).filter_by(id=chat_id).first()
-        finally:
-            session.close()
 
 
 class MessageRepository:
@@ -108,7 +294,7 @@ class MessageRepository:
         sender_id: int,
         sender_name: str,
         content: str,
-        timestamp: datetime,
+        timestamp: int,
         is_from_me: bool,
         has_media: bool = False,
         media_type: Optional[str] = None,
@@ -117,52 +303,139 @@ class MessageRepository:
         file_size: Optional[int] = None,
         mime_type: Optional[str] = None,
     ) -> None:
-        """Store a message in the database."""
+        """Store a message in the database.
+
+        A single-row upsert through the same statement as the bulk path:
+        no lookup SELECT, no ORM identity-map pass, one round trip.
+        """
         # Allow messages with media even if content is empty
         if not content and not has_media:
             return
 
-        session = get_session()
-        try:
-            message = session.query(Message).filter_by(
-                id=message_id, chat_id=chat_id
-            ).first()
+        self.store_messages_bulk([{
+            "id": message_id,
+            "chat_id": chat_id,
+            "sender_id": sender_id,
+            "sender_name": sender_name,
+            "content": content,
+            "timestamp": timestamp,
+            "is_from_me": is_from_me,
+            "has_media": has_media,
+            "media_type": media_type,
+            "file_id": file_id,
+            "file_name": file_name,
+            "file_size": file_size,
+            "mime_type": mime_type,
+        }])
+
+    def store_messages_bulk(self, rows: List[Any]) -> int:
+        """Store a batch of messages with chunked single-statement upserts.
+
+        Replaces the per-message SELECT + INSERT/UPDATE + commit pattern
+        with one INSERT ... ON CONFLICT DO UPDATE per chunk and a single
+        commit for the whole batch. Rows are the middleware's slotted
+        MessageRow records (or plain dicts with the same keys); extra
+        fields such as chat_title are ignored and local_path is preserved
+        on conflict.
+
+        Args:
+            rows: Processed message rows
+
+        Returns:
+            int: Number of rows written
+        """
+        tuples = self._message_rows(rows)
+        if not tuples:
+            return 0
+
+        # One precompiled statement, all rows through the driver's
+        # executemany as positional tuples, one commit
+        with get_session() as session:
+            session.connection().exec_driver_sql(_MESSAGE_UPSERT_SQL, tuples)
+            session.commit()
+            return len(tuples)
+
+    def store_messages_bulk_fast(self, rows: List[Any]) -> int:
+        """Bulk-load variant for full-history syncs.
 
-            if message:
-                # Update existing message
-                message.sender_id = sender_id
-                message.sender_name = sender_name
-                message.content = content
-                message.timestamp = timestamp
-                message.is_from_me = is_from_me
-                message.has_media = has_media
-                message.media_type = media_type
-                message.file_id = file_id
-                message.file_name = file_name
-                message.file_size = file_size
-                message.mime_type = mime_type
+        Same precompiled upsert and executemany as store_messages_bulk,
+        but on a dedicated connection with synchronous=OFF for the
+        duration of the load: the fsync per commit disappears, widening
+        the crash window only for data a re-run of the sync restores.
+        SQLite has no COPY equivalent, so this is its dialect-native
+        fast path.
+
+        Args:
+            rows: Processed message rows
+
+        Returns:
+            int: Number of rows written
+        """
+        tuples = self._message_rows(rows)
+        if not tuples:
+            return 0
+
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            # Close the autobegun transaction so the load gets its own
+            conn.commit()
+            try:
+                with conn.begin():
+                    conn.exec_driver_sql(_MESSAGE_UPSERT_SQL, tuples)
+            finally:
+                conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+        return len(tuples)
+
+    @staticmethod
+    def _message_rows(rows: List[Any]) -> List[tuple]:
+        """Normalize rows to positional tuples, dropping empty messages.
+
+        Slotted MessageRow records become tuples in one attrgetter call;
+        dicts (the single-message path) are projected column by column.
+        Tuple indexes 4 and 7 are content and has_media.
+        """
+        tuples: List[tuple] = []
+        for row in rows:
+            if isinstance(row, dict):
+                values = tuple(row.get(col) for col in _MESSAGE_COLUMNS)
             else:
-                # Create new message
-                message = Message(
-                    id=message_id,
-                    chat_id=chat_id,
-                    sender_id=sender_id,
-                    sender_name=sender_name,
-                    content=content or "",
-                    timestamp=timestamp,
-                    is_from_me=is_from_me,
-                    has_media=has_media,
-                    media_type=media_type,
-                    file_id=file_id,
-                    file_name=file_name,
-                    file_size=file_size,
-                    mime_type=mime_type,
+                values = _ROW_VALUES(row)
+            # Same rule as store_message: keep media-only messages,
+            # drop truly empty ones
+            if not values[4] and not values[7]:
+                continue
+            if values[4] is None:
+                values = values[:4] + ("",) + values[5:]
+            tuples.append(values)
+        return tuples
+
+    def search_messages(
+        self,
+        query: str,
+        chat_id: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[Message]:
+        """Search message content via the FTS5 index.
+
+        Uses the messages_fts virtual table, so keyword searches are
+        tokenized index lookups instead of full-table LIKE scans.
+        """
+        with get_session() as session:
+            db_query = session.query(Message).filter(
+                text(
+                    "messages.rowid IN "
+                    "(SELECT rowid FROM messages_fts WHERE messages_fts MATCH :q)"
                 )
-                session.add(message)
+            ).params(q=query)
 
-            session.commit()
-        finally:
-            session.close()
+            if chat_id:
+                db_query = db_query.filter(Message.chat_id == chat_id)
+
+            db_query = db_query.order_by(desc(Message.timestamp))
+            db_query = db_query.limit(limit).offset(offset)
+
+            return db_query.all()
 
     def get_messages_with_media(
         self,
@@ -172,8 +445,7 @@ class MessageRepository:
         offset: int = 0,
     ) -> List[Message]:
         """Get messages that have media attachments."""
-        session = get_session()
-        try:
+        with get_session() as session:
             db_query = session.query(Message).filter(Message.has_media == True)
 
             if chat_id:
@@ -186,8 +458,73 @@ class MessageRepository:
             db_query = db_query.limit(limit).offset(offset)
 
             return db_query.all()
-        finally:
-            session.close()
+
+    def get_max_message_id(self, chat_id: int) -> Optional[int]:
+        """Get the highest stored message ID for a chat.
+
+        One indexed MAX over the primary key; used to resume incremental
+        syncs from where the last one stopped.
+        """
+        with get_session() as session:
+            return session.execute(
+                select(func.max(Message.id)).where(Message.chat_id == chat_id)
+            ).scalar()
+
+    def get_attachments_as_dicts(
+        self,
+        chat_id: Optional[int] = None,
+        media_type: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Get media messages as response-shaped dicts.
+
+        The statement already labels columns with the attachment dict
+        keys, so no per-row repacking happens in Python; the partial
+        media index serves the scan pre-sorted.
+        """
+        stmt = _attachments_stmt(bool(chat_id), bool(media_type))
+
+        params: Dict[str, Any] = {"limit": limit}
+        if chat_id:
+            params["chat_id"] = chat_id
+        if media_type:
+            params["media_type"] = media_type
+
+        with get_session() as session:
+            return [dict(r) for r in session.execute(stmt, params).mappings()]
+
+    def iter_messages(
+        self,
+        chat_id: Optional[int] = None,
+        has_media: Optional[bool] = None,
+        media_type: Optional[str] = None,
+        batch_size: int = 200,
+    ):
+        """Stream messages without materializing the full result set.
+
+        Uses yield_per so the driver fetches batch_size rows at a time
+        and only that many ORM instances are alive at once — meant for
+        large exports/sync-adjacent reads where get_messages' .all()
+        would pin the whole result. The generator holds its session
+        open until exhausted or closed.
+
+        Yields:
+            Message: Each matching message, newest first
+        """
+        stmt = select(Message).order_by(desc(Message.timestamp))
+        if chat_id:
+            stmt = stmt.where(Message.chat_id == chat_id)
+        if has_media is not None:
+            stmt = stmt.where(Message.has_media == has_media)
+        if media_type:
+            stmt = stmt.where(Message.media_type == media_type)
+
+        with get_session() as session:
+            result = session.execute(
+                stmt.execution_options(yield_per=batch_size)
+            ).scalars()
+            for message in result:
+                yield message
 
     def update_local_path(
         self,
@@ -195,30 +532,53 @@ class MessageRepository:
         chat_id: int,
         local_path: str
     ) -> bool:
-        """Update the local path for a downloaded attachment."""
-        session = get_session()
-        try:
-            message = session.query(Message).filter_by(
-                id=message_id, chat_id=chat_id
-            ).first()
+        """Update the local path for a downloaded attachment.
+
+        Issues a single UPDATE; the rowcount says whether the message
+        existed, so no prior SELECT is needed.
+        """
+        with get_session() as session:
+            result = session.execute(
+                update(Message)
+                .where(Message.id == message_id, Message.chat_id == chat_id)
+                .values(local_path=local_path)
+            )
+            session.commit()
+            return result.rowcount > 0
+
+    def update_local_paths_bulk(self, rows: List[Tuple[int, int, str]]) -> int:
+        """Record local paths for many downloaded attachments at once.
 
-            if message:
-                message.local_path = local_path
-                session.commit()
-                return True
-            return False
-        finally:
-            session.close()
+        One UPDATE statement through the driver's executemany in a
+        single transaction, instead of a round trip and commit per file.
+
+        Args:
+            rows: (message_id, chat_id, local_path) triples
+
+        Returns:
+            int: Number of rows updated
+        """
+        if not rows:
+            return 0
+
+        # Positional executemany on the connection, like the message
+        # upsert: the ORM session would otherwise route a parameter list
+        # into its bulk-update-by-primary-key path
+        params = [(path, mid, cid) for mid, cid, path in rows]
+        with get_session() as session:
+            result = session.connection().exec_driver_sql(
+                "UPDATE messages SET local_path = ? WHERE id = ? AND chat_id = ?",
+                params,
+            )
+            session.commit()
+            return max(result.rowcount, 0)
 
     def get_message_by_id(self, message_id: int, chat_id: int) -> Optional[Message]:
         """Get a specific message by ID and chat_id."""
-        session = get_session()
-        try:
+        with get_session() as session:
             return session.query(Message).filter_by(
                 id=message_id, chat_id=chat_id
             ).first()
-        finally:
-            session.close()
     
     def get_messages(
         self,
@@ -228,42 +588,78 @@ class MessageRepository:
         limit: int = 50,
         offset: int = 0,
         date_range: Optional[Tuple[datetime, datetime]] = None,
+        cursor: Optional[Tuple[int, int]] = None,
     ) -> List[Message]:
-        """Get messages from the database."""
-        session = get_session()
-        try:
-            # Build query — eager load chat to avoid DetachedInstanceError
-            db_query = session.query(Message).options(joinedload(Message.chat))
-            
-            # Apply filters
-            filters = []
-            
-            if chat_id:
-                filters.append(Message.chat_id == chat_id)
-                
-            if sender_id:
-                filters.append(Message.sender_id == sender_id)
-                
-            if query:
-                filters.append(Message.content.ilike(f"%{query}%"))
-                
-            if date_range:
-                start_date, end_date = date_range
-                filters.append(and_(
-                    Message.timestamp >= start_date,
-                    Message.timestamp <= end_date
-                ))
-                
-            if filters:
-                db_query = db_query.filter(and_(*filters))
-                
-            # Apply sorting and pagination
-            db_query = db_query.order_by(desc(Message.timestamp))
-            db_query = db_query.limit(limit).offset(offset)
-            
-            return db_query.all()
-        finally:
-            session.close()
+        """Get messages from the database.
+
+        When cursor is given as the (timestamp, id) of the last row of
+        the previous page, rows strictly after it are returned via a
+        keyset predicate and offset is ignored.
+        """
+        stmt = _messages_stmt(
+            bool(chat_id), bool(sender_id), bool(query), bool(date_range),
+            cursor is not None,
+        )
+        params = self._messages_params(
+            chat_id, sender_id, query, limit, offset, date_range, cursor
+        )
+
+        with get_session() as session:
+            return session.execute(stmt, params).scalars().all()
+
+    def get_messages_rows(
+        self,
+        chat_id: Optional[int] = None,
+        sender_id: Optional[int] = None,
+        query: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        date_range: Optional[Tuple[datetime, datetime]] = None,
+        cursor: Optional[Tuple[int, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get messages as plain column mappings with the chat title.
+
+        Read-only variant of get_messages that selects columns and joins
+        the chat title instead of materializing ORM instances; rows
+        unpack directly into response models.
+        """
+        stmt = _messages_stmt(
+            bool(chat_id), bool(sender_id), bool(query), bool(date_range),
+            cursor is not None, as_rows=True,
+        )
+        params = self._messages_params(
+            chat_id, sender_id, query, limit, offset, date_range, cursor
+        )
+
+        with get_session() as session:
+            return session.execute(stmt, params).mappings().all()
+
+    @staticmethod
+    def _messages_params(
+        chat_id, sender_id, query, limit, offset, date_range, cursor
+    ) -> Dict[str, Any]:
+        """Bind-parameter dict shared by the entity and row listings."""
+        params: Dict[str, Any] = {"limit": limit}
+        if cursor is not None:
+            params["cursor_ts"], params["cursor_id"] = cursor
+        else:
+            params["offset"] = offset
+        if chat_id:
+            params["chat_id"] = chat_id
+        if sender_id:
+            params["sender_id"] = sender_id
+        if query:
+            params["query"] = _fts_prefix_query(query)
+        if date_range:
+            start_date, end_date = date_range
+            # Timestamps are stored as epoch seconds
+            if isinstance(start_date, datetime):
+                start_date = int(start_date.timestamp())
+            if isinstance(end_date, datetime):
+                end_date = int(end_date.timestamp())
+            params["start_ts"] = start_date
+            params["end_ts"] = end_date
+        return params
     
     def get_message_context(
         self,
@@ -272,39 +668,36 @@ class MessageRepository:
         before: int = 5,
         after: int = 5
     ) -> Dict[str, Any]:
-        """Get context around a specific message."""
-        session = get_session()
-        try:
-            # Get the target message — eager load chat to avoid DetachedInstanceError
-            target_message = session.query(Message).options(
-                joinedload(Message.chat)
-            ).filter_by(
-                id=message_id, chat_id=chat_id
-            ).first()
+        """Get context around a specific message.
+
+        A single windowed statement fetches the target row plus both
+        context windows in one round trip; the rows are split afterwards
+        by timestamp relative to the target.
+        """
+        with get_session() as session:
+            rows = session.execute(_CONTEXT_STMT, {
+                "mid": message_id,
+                "cid": chat_id,
+                "before": before,
+                "after": after,
+            }).mappings().all()
+
+        target = next((dict(r) for r in rows if r["id"] == message_id), None)
+        if target is None:
+            raise ValueError(f"Message with ID {message_id} in chat {chat_id} not found")
+
+        ts = target["timestamp"]
+        before_rows = sorted(
+            (dict(r) for r in rows if r["timestamp"] < ts),
+            key=lambda r: (r["timestamp"], r["id"]), reverse=True,
+        )
+        after_rows = sorted(
+            (dict(r) for r in rows if r["timestamp"] > ts),
+            key=lambda r: (r["timestamp"], r["id"]),
+        )
 
-            if not target_message:
-                raise ValueError(f"Message with ID {message_id} in chat {chat_id} not found")
-
-            # Get messages before
-            before_messages = session.query(Message).options(
-                joinedload(Message.chat)
-            ).filter(
-                Message.chat_id == chat_id,
-                Message.timestamp < target_message.timestamp
-            ).order_by(desc(Message.timestamp)).limit(before).all()
-
-            # Get messages after
-            after_messages = session.query(Message).options(
-                joinedload(Message.chat)
-            ).filter(
-                Message.chat_id == chat_id,
-                Message.timestamp > target_message.timestamp
-            ).order_by(Message.timestamp).limit(after).all()
-            
-            return {
-                "message": target_message,
-                "before": before_messages,
-                "after": after_messages
-            }
-        finally:
-            session.close()
\ No newline at end of file
+        return {
+            "message": target,
+            "before": before_rows,
+            "after": after_rows
+        }
\ No newline at end of file
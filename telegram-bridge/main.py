@@ -127,6 +127,10 @@ async def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        # Drain any live messages still buffered for the next flush
+        if telegram_service is not None:
+            await telegram_service.shutdown()
 
 
 if __name__ == "__main__":
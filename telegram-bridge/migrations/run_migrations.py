@@ -14,11 +14,182 @@ DB_PATH = os.path.join(
 )
 
 
-def column_exists(cursor, table, column):
-    """Check if a column exists in a table."""
+def get_columns(cursor, table):
+    """Get the set of column names of a table."""
     cursor.execute(f"PRAGMA table_info({table})")
-    columns = [info[1] for info in cursor.fetchall()]
-    return column in columns
+    return {info[1] for info in cursor.fetchall()}
+
+
+def table_exists(cursor, table):
+    """Check if a table exists in the database."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?",
+        (table,)
+    )
+    return cursor.fetchone() is not None
+
+
+def migrate_content_fts(conn, cursor):
+    """Replace the btree index on messages.content with an FTS5 table.
+
+    The btree index cannot serve substring/keyword searches but still
+    has to be maintained on every insert; the FTS5 virtual table gives
+    tokenized lookups and is kept in sync via triggers.
+    """
+    if table_exists(cursor, 'messages_fts'):
+        return
+
+    print("Creating full-text search index for message content...")
+    cursor.execute("DROP INDEX IF EXISTS idx_messages_content")
+    cursor.execute(
+        "CREATE VIRTUAL TABLE messages_fts "
+        "USING fts5(content, content='messages', content_rowid='rowid')"
+    )
+    cursor.execute(
+        "CREATE TRIGGER messages_fts_ai AFTER INSERT ON messages BEGIN "
+        "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); "
+        "END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER messages_fts_ad AFTER DELETE ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content) "
+        "VALUES ('delete', old.rowid, old.content); "
+        "END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+        "INSERT INTO messages_fts(messages_fts, rowid, content) "
+        "VALUES ('delete', old.rowid, old.content); "
+        "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); "
+        "END"
+    )
+    # Index existing rows
+    cursor.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+    conn.commit()
+    print("Full-text search index created.")
+
+
+def index_exists(cursor, index):
+    """Check if an index exists in the database."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+        (index,)
+    )
+    return cursor.fetchone() is not None
+
+
+def migrate_chat_ts_index(conn, cursor):
+    """Replace the chat_id and timestamp single-column indexes.
+
+    A composite (chat_id, timestamp) index answers "latest N messages in
+    chat X ordered by time" with one range scan, and dropping the two
+    redundant indexes removes their maintenance cost on every insert.
+    """
+    if index_exists(cursor, 'idx_chat_ts'):
+        return
+
+    print("Creating composite (chat_id, timestamp) index...")
+    cursor.execute("DROP INDEX IF EXISTS idx_messages_chat_id")
+    cursor.execute("DROP INDEX IF EXISTS idx_messages_timestamp")
+    cursor.execute("CREATE INDEX idx_chat_ts ON messages(chat_id, timestamp)")
+    conn.commit()
+    print("Composite index created.")
+
+
+def migrate_chat_sender_ts_index(conn, cursor):
+    """Add a (chat_id, sender_id, timestamp) index.
+
+    Serves get_messages calls filtering by chat and sender together with
+    an index-ordered scan; the context queries' chat+timestamp shape is
+    already covered by idx_chat_ts.
+    """
+    if index_exists(cursor, 'idx_chat_sender_ts'):
+        return
+
+    print("Creating composite (chat_id, sender_id, timestamp) index...")
+    cursor.execute(
+        "CREATE INDEX idx_chat_sender_ts ON messages(chat_id, sender_id, timestamp)"
+    )
+    conn.commit()
+    print("Composite index created.")
+
+
+def migrate_chats_fts(conn, cursor):
+    """Create the FTS5 table backing chat title/username search."""
+    if table_exists(cursor, 'chats_fts'):
+        return
+
+    print("Creating full-text search index for chats...")
+    cursor.execute(
+        "CREATE VIRTUAL TABLE chats_fts "
+        "USING fts5(title, username, content='chats', content_rowid='rowid')"
+    )
+    cursor.execute(
+        "CREATE TRIGGER chats_fts_ai AFTER INSERT ON chats BEGIN "
+        "INSERT INTO chats_fts(rowid, title, username) "
+        "VALUES (new.rowid, new.title, new.username); "
+        "END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER chats_fts_ad AFTER DELETE ON chats BEGIN "
+        "INSERT INTO chats_fts(chats_fts, rowid, title, username) "
+        "VALUES ('delete', old.rowid, old.title, old.username); "
+        "END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER chats_fts_au AFTER UPDATE ON chats BEGIN "
+        "INSERT INTO chats_fts(chats_fts, rowid, title, username) "
+        "VALUES ('delete', old.rowid, old.title, old.username); "
+        "INSERT INTO chats_fts(rowid, title, username) "
+        "VALUES (new.rowid, new.title, new.username); "
+        "END"
+    )
+    cursor.execute("INSERT INTO chats_fts(chats_fts) VALUES ('rebuild')")
+    conn.commit()
+    print("Chat full-text search index created.")
+
+
+def migrate_media_partial_index(conn, cursor):
+    """Replace the whole-column has_media index with a partial index.
+
+    A btree over a skewed boolean is nearly useless to the planner; the
+    partial index covers only rows with media and stores them already
+    ordered for the attachment listing query.
+    """
+    if index_exists(cursor, 'idx_messages_media'):
+        return
+
+    print("Creating partial index for media messages...")
+    cursor.execute("DROP INDEX IF EXISTS idx_messages_has_media")
+    cursor.execute(
+        "CREATE INDEX idx_messages_media "
+        "ON messages(chat_id, media_type, timestamp DESC) "
+        "WHERE has_media = 1"
+    )
+    conn.commit()
+    print("Partial media index created.")
+
+
+def migrate_epoch_timestamps(conn, cursor):
+    """Convert messages.timestamp from ISO text to unix epoch integers.
+
+    Integer timestamps compare and index as fixed-width values and skip
+    the per-row datetime parsing SQLAlchemy did for DateTime columns.
+    """
+    cursor.execute(
+        "SELECT COUNT(*) FROM messages WHERE typeof(timestamp) = 'text'"
+    )
+    if cursor.fetchone()[0] == 0:
+        return
+
+    print("Converting message timestamps to unix epoch...")
+    cursor.execute(
+        "UPDATE messages "
+        "SET timestamp = CAST(strftime('%s', timestamp) AS INTEGER) "
+        "WHERE typeof(timestamp) = 'text'"
+    )
+    conn.commit()
+    print("Timestamps converted.")
 
 
 def run_migrations():
@@ -31,6 +202,15 @@ def run_migrations():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    # WAL and relaxed fsync speed up both the migration itself and
+    # steady-state writes afterwards (journal_mode persists in the file)
+    cursor.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-65536;"
+    )
+
     try:
         # Check if migrations are needed
         new_columns = [
@@ -43,23 +223,45 @@ def run_migrations():
             ('local_path', 'VARCHAR'),
         ]
 
+        # Fetch the schema once instead of one PRAGMA per candidate column
+        existing_columns = get_columns(cursor, 'messages')
+
+        # One transaction for all ALTERs and the index build, instead of
+        # an fsync-delimited autocommit per statement
+        cursor.execute("BEGIN IMMEDIATE")
+
         migrations_needed = False
         for col_name, col_type in new_columns:
-            if not column_exists(cursor, 'messages', col_name):
+            if col_name not in existing_columns:
                 migrations_needed = True
                 print(f"Adding column: {col_name}")
                 cursor.execute(f"ALTER TABLE messages ADD COLUMN {col_name} {col_type}")
 
         if migrations_needed:
-            # Create index for media queries
-            cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_messages_has_media ON messages(has_media)"
-            )
             conn.commit()
             print("Migration completed successfully!")
         else:
+            conn.rollback()
             print("Database is already up to date.")
 
+        # Replace the content btree index with an FTS5 full-text index
+        migrate_content_fts(conn, cursor)
+
+        # Replace single-column chat_id/timestamp indexes with a composite
+        migrate_chat_ts_index(conn, cursor)
+
+        # Composite index for chat + sender filtered listings
+        migrate_chat_sender_ts_index(conn, cursor)
+
+        # Partial index for media messages, replacing the boolean index
+        migrate_media_partial_index(conn, cursor)
+
+        # Convert stored message timestamps to unix epoch integers
+        migrate_epoch_timestamps(conn, cursor)
+
+        # Full-text index over chat titles and usernames
+        migrate_chats_fts(conn, cursor)
+
     except Exception as e:
         print(f"Migration error: {e}")
         conn.rollback()
@@ -4,8 +4,12 @@ FastAPI application for the Telegram bridge.
 Provides HTTP API endpoints for interacting with Telegram.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
-from typing import List, Optional
+import base64
+import binascii
+from typing import List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 
 from api.models import (
     ChatModel,
@@ -18,6 +22,9 @@ from api.models import (
     DownloadResponse,
     SyncRequest,
     SyncResponse,
+    ChatListAdapter,
+    MessageListAdapter,
+    AttachmentListAdapter,
 )
 from service import TelegramService
 
@@ -39,6 +46,30 @@ def get_telegram_service() -> TelegramService:
     raise NotImplementedError("Telegram service not initialized")
 
 
+def _project_messages(rows) -> List[MessageModel]:
+    """Build response models from message row mappings.
+
+    model_construct skips validation, which is safe for rows the
+    database already validated; the rows carry exactly the model's
+    fields, chat_title included via the repository join.
+    """
+    return [MessageModel.model_construct(**row) for row in rows]
+
+
+def _encode_cursor(timestamp: int, message_id: int) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque token."""
+    return base64.urlsafe_b64encode(f"{timestamp}:{message_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode an opaque pagination token back to (timestamp, id)."""
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(cursor).decode().split(":")
+        return int(timestamp), int(message_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/api/chats", response_model=List[ChatModel])
 async def list_chats(
     query: Optional[str] = None,
@@ -49,22 +80,21 @@ async def list_chats(
     service: TelegramService = Depends(get_telegram_service)
 ):
     """List chats."""
-    chats = service.chat_repo.get_chats(
+    # Repository calls are synchronous SQLAlchemy; run them in the
+    # threadpool so a slow query never blocks the event loop.
+    chats = await run_in_threadpool(
+        service.chat_repo.get_chats_rows,
         query=query,
         limit=limit,
         offset=offset,
         chat_type=chat_type,
         sort_by=sort_by
     )
-    return [
-        ChatModel(
-            id=chat.id,
-            title=chat.title,
-            username=chat.username,
-            type=chat.type,
-            last_message_time=chat.last_message_time
-        ) for chat in chats
-    ]
+    models = [ChatModel.model_construct(**row) for row in chats]
+    return Response(
+        content=ChatListAdapter.dump_json(models),
+        media_type="application/json"
+    )
 
 
 @app.get("/api/messages", response_model=List[MessageModel])
@@ -74,28 +104,33 @@ async def list_messages(
     query: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     service: TelegramService = Depends(get_telegram_service)
 ):
-    """List messages."""
-    messages = service.message_repo.get_messages(
+    """List messages.
+
+    Deep pagination should pass the opaque cursor from the previous
+    response's X-Next-Cursor header instead of offset; the cursor resumes
+    via a keyset predicate and stays O(limit) at any page depth.
+    """
+    messages = await run_in_threadpool(
+        service.message_repo.get_messages_rows,
         chat_id=chat_id,
         sender_id=sender_id,
         query=query,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=_decode_cursor(cursor) if cursor else None
+    )
+    models = _project_messages(messages)
+    headers = {}
+    if models:
+        headers["X-Next-Cursor"] = _encode_cursor(models[-1].timestamp, models[-1].id)
+    return Response(
+        content=MessageListAdapter.dump_json(models),
+        media_type="application/json",
+        headers=headers
     )
-    return [
-        MessageModel(
-            id=msg.id,
-            chat_id=msg.chat_id,
-            chat_title=msg.chat.title,
-            sender_id=msg.sender_id,
-            sender_name=msg.sender_name,
-            content=msg.content,
-            timestamp=msg.timestamp,
-            is_from_me=msg.is_from_me
-        ) for msg in messages
-    ]
 
 
 @app.get("/api/messages/{chat_id}/{message_id}/context", response_model=MessageContextModel)
@@ -108,56 +143,16 @@ async def get_message_context(
 ):
     """Get context around a message."""
     try:
-        context = service.message_repo.get_message_context(
+        context = await run_in_threadpool(
+            service.message_repo.get_message_context,
             message_id=message_id,
             chat_id=chat_id,
             before=before,
             after=after
         )
         
-        # Convert to model
-        target_message = MessageModel(
-            id=context["message"].id,
-            chat_id=context["message"].chat_id,
-            chat_title=context["message"].chat.title,
-            sender_id=context["message"].sender_id,
-            sender_name=context["message"].sender_name,
-            content=context["message"].content,
-            timestamp=context["message"].timestamp,
-            is_from_me=context["message"].is_from_me
-        )
-        
-        before_messages = [
-            MessageModel(
-                id=msg.id,
-                chat_id=msg.chat_id,
-                chat_title=msg.chat.title,
-                sender_id=msg.sender_id,
-                sender_name=msg.sender_name,
-                content=msg.content,
-                timestamp=msg.timestamp,
-                is_from_me=msg.is_from_me
-            ) for msg in context["before"]
-        ]
-        
-        after_messages = [
-            MessageModel(
-                id=msg.id,
-                chat_id=msg.chat_id,
-                chat_title=msg.chat.title,
-                sender_id=msg.sender_id,
-                sender_name=msg.sender_name,
-                content=msg.content,
-                timestamp=msg.timestamp,
-                is_from_me=msg.is_from_me
-            ) for msg in context["after"]
-        ]
-        
-        return MessageContextModel(
-            message=target_message,
-            before=before_messages,
-            after=after_messages
-        )
+        # Convert to model; from_attributes handles the nested messages
+        return MessageContextModel.model_validate(context)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -188,7 +183,11 @@ async def list_attachments(
         media_type=media_type,
         limit=limit
     )
-    return [AttachmentModel(**att) for att in attachments]
+    models = [AttachmentModel(**att) for att in attachments]
+    return Response(
+        content=AttachmentListAdapter.dump_json(models),
+        media_type="application/json"
+    )
 
 
 @app.post("/api/download", response_model=DownloadResponse)
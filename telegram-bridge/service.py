@@ -5,14 +5,18 @@ Connects the API middleware with database repositories to provide
 high-level operations for the application.
 """
 
+import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
 from telethon import events
 
-from api import TelegramApiClient, TelegramMiddleware
+from api import TelegramApiClient, TelegramMiddleware, MessageRow
 from database import ChatRepository, MessageRepository
 
 logger = logging.getLogger(__name__)
@@ -20,6 +24,42 @@ logger = logging.getLogger(__name__)
 # Default download directory
 DOWNLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'store', 'media')
 
+# Messages buffered per bulk write during history syncs
+SYNC_FLUSH_SIZE = 1000
+
+# Concurrent process_message workers and queue bound for sync pipelines
+PIPELINE_WORKERS = 8
+PIPELINE_QUEUE_SIZE = 2000
+
+# Dialogs synced concurrently by sync_all_dialogs
+DIALOG_SYNC_CONCURRENCY = 4
+
+# Chats remembered by the live-event write-through cache
+CHAT_CACHE_SIZE = 4096
+
+# Live messages are micro-batched: flush every interval or row count,
+# whichever comes first
+LIVE_FLUSH_INTERVAL = 0.25
+LIVE_FLUSH_ROWS = 200
+LIVE_FLUSH_MAX = 500
+
+# Resolved Telegram entities kept for reuse across operations
+ENTITY_CACHE_SIZE = 256
+
+# Resolved recipient entities kept per send_message identifier string
+RECIPIENT_CACHE_SIZE = 1024
+
+# How long a processed chat-info dict stays valid for live events; long
+# enough to skip re-processing per message, short enough that title
+# renames still show up promptly
+CHAT_INFO_TTL = 60.0
+
+# Concurrent transfers per download_media_many call
+DOWNLOAD_CONCURRENCY = 8
+
+# How long a download-directory scan stays valid for attachment listings
+DOWNLOAD_SCAN_TTL = 1.0
+
 
 class TelegramService:
     """Service for Telegram operations."""
@@ -43,6 +83,30 @@ class TelegramService:
         self.middleware = middleware
         self.chat_repo = chat_repo
         self.message_repo = message_repo
+        # chat_id -> (title, username, type, minute bucket) of the last
+        # write, so live events skip redundant chat upserts (LRU-bounded)
+        self._chat_cache: "OrderedDict[int, tuple]" = OrderedDict()
+        # Buffer of live messages awaiting a micro-batch flush
+        self._live_buf: "deque[MessageRow]" = deque()
+        self._flusher_task: Optional[asyncio.Task] = None
+        # chat_id -> resolved entity, so repeated sends/syncs/downloads
+        # skip re-resolution round trips (LRU-bounded)
+        self._entity_cache: "OrderedDict[int, Any]" = OrderedDict()
+        # recipient string -> resolved entity, so repeat sends skip the
+        # Telegram/DB resolution chain entirely (LRU-bounded)
+        self._recipient_cache: "OrderedDict[str, Any]" = OrderedDict()
+        # chat_id -> (monotonic time, processed chat info), so live
+        # events skip the attribute walk for CHAT_INFO_TTL seconds
+        self._chat_info_cache: "Dict[int, Tuple[float, Dict[str, Any]]]" = {}
+        # Snapshot of downloaded file paths, refreshed at most once per TTL
+        self._downloaded_paths: set = set()
+        self._downloaded_scan_time = 0.0
+        # Executor for CPU-bound message decoding, so parsing a batch
+        # never stalls the event loop's Telethon traffic
+        self._cpu_pool = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 4,
+            thread_name_prefix="msg-decode",
+        )
         
     async def setup(self) -> None:
         """Set up the service, connect to Telegram, and register handlers."""
@@ -51,6 +115,22 @@ class TelegramService:
         
         # Register event handlers
         self.client.add_event_handler(self._handle_new_message, events.NewMessage)
+
+        # Periodic flusher for the live message buffer
+        self._flusher_task = asyncio.create_task(self._flush_loop())
+
+    async def shutdown(self) -> None:
+        """Stop the background flusher and drain buffered messages."""
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        while self._live_buf:
+            await self._drain_live_buffer()
+        self._cpu_pool.shutdown(wait=False)
         
     async def authorize(self) -> bool:
         """Authorize with Telegram if needed."""
@@ -98,16 +178,26 @@ class TelegramService:
         # Get all dialogs (chats)
         dialogs = await self.client.get_dialogs(limit=dialog_limit)
 
-        for i, dialog in enumerate(dialogs, 1):
-            try:
-                logger.info(f"Syncing dialog {i}/{len(dialogs)}: {dialog.name}")
-                await self.sync_dialog_history(
-                    dialog,
-                    limit=message_limit,
-                    full_sync=full_sync
-                )
-            except Exception as e:
-                logger.error(f"Error syncing dialog {dialog.name}: {e}")
+        # Sync a few dialogs concurrently so one slow chat doesn't stall
+        # the rest; the bound keeps Telegram DC rate limits at bay. Each
+        # sync uses its own sessions, so there is no DB contention.
+        sem = asyncio.Semaphore(DIALOG_SYNC_CONCURRENCY)
+
+        async def _sync_one(index: int, dialog) -> None:
+            async with sem:
+                logger.info(f"Syncing dialog {index}/{len(dialogs)}: {dialog.name}")
+                try:
+                    await self.sync_dialog_history(
+                        dialog,
+                        limit=message_limit,
+                        full_sync=full_sync
+                    )
+                except Exception as e:
+                    logger.error(f"Error syncing dialog {dialog.name}: {e}")
+
+        await asyncio.gather(
+            *(_sync_one(i, dialog) for i, dialog in enumerate(dialogs, 1))
+        )
 
         logger.info(f"Completed synchronization of {len(dialogs)} dialogs")
 
@@ -121,12 +211,12 @@ class TelegramService:
             Tuple[bool, str, int]: (success, message, count)
         """
         try:
-            entity = await self.client.get_entity(chat_id)
+            entity = await self._get_entity_cached(chat_id)
             if not entity:
                 return False, f"Chat {chat_id} not found", 0
 
             # Get chat info
-            chat_info = await self.middleware.process_chat_entity(entity)
+            chat_info = self.middleware.process_chat_entity(entity)
 
             # Store/update chat info
             self.chat_repo.store_chat(
@@ -137,30 +227,13 @@ class TelegramService:
                 last_message_time=None
             )
 
-            # Sync all messages
-            count = 0
-            async for message in self.client.iter_all_messages(entity, limit=None):
-                msg_info = await self.middleware.process_message(message)
-                if msg_info:
-                    self.message_repo.store_message(
-                        message_id=msg_info["id"],
-                        chat_id=msg_info["chat_id"],
-                        sender_id=msg_info["sender_id"],
-                        sender_name=msg_info["sender_name"],
-                        content=msg_info["content"],
-                        timestamp=msg_info["timestamp"],
-                        is_from_me=msg_info["is_from_me"],
-                        has_media=msg_info.get("has_media", False),
-                        media_type=msg_info.get("media_type"),
-                        file_id=msg_info.get("file_id"),
-                        file_name=msg_info.get("file_name"),
-                        file_size=msg_info.get("file_size"),
-                        mime_type=msg_info.get("mime_type"),
-                    )
-                    count += 1
-
-                if count % 500 == 0:
-                    logger.info(f"Synced {count} messages from {chat_info['title']}...")
+            # Sync all messages through the processing pipeline, using
+            # the relaxed-durability bulk loader (a failed run re-syncs)
+            count = await self._sync_messages_pipeline(
+                self.client.iter_message_batches(entity),
+                chat_info["title"],
+                fast=True,
+            )
 
             return True, f"Synced {count} messages from {chat_info['title']}", count
 
@@ -172,7 +245,8 @@ class TelegramService:
         self,
         dialog,
         limit: int = None,
-        full_sync: bool = False
+        full_sync: bool = False,
+        incremental: bool = True
     ) -> None:
         """Sync message history for a specific dialog.
 
@@ -180,9 +254,11 @@ class TelegramService:
             dialog: Dialog to sync
             limit: Maximum number of messages to retrieve (None for all if full_sync)
             full_sync: If True, fetch all messages; if False, only recent (default 100)
+            incremental: If True, skip messages already stored (ignored
+                for full syncs, which must walk the whole history)
         """
         # Process dialog entity
-        chat_info = await self.middleware.process_dialog(dialog)
+        chat_info = self.middleware.process_dialog(dialog)
 
         if not chat_info:
             logger.warning(f"Could not process dialog: {dialog}")
@@ -203,33 +279,141 @@ class TelegramService:
         else:
             msg_limit = limit or 100  # Default to 100 for quick sync
 
-        # Use iterator for potentially large message sets
+        # Resume from the newest stored message so re-syncs only fetch
+        # the delta. Full syncs still walk everything: quick syncs leave
+        # gaps below their limit that min_id would wrongly skip.
+        min_id = 0
+        if incremental and not full_sync:
+            min_id = await asyncio.to_thread(
+                self.message_repo.get_max_message_id, chat_info["id"]
+            ) or 0
+
+        # Use batch iterator for potentially large message sets
+        count = await self._sync_messages_pipeline(
+            self.client.iter_message_batches(
+                dialog.entity, limit=msg_limit, min_id=min_id
+            ),
+            chat_info["title"],
+            fast=full_sync,
+        )
+
+        logger.info(f"Synced {count} messages from {chat_info['title']}")
+
+    async def _sync_messages_pipeline(self, batches, chat_title: str,
+                                      fast: bool = False) -> int:
+        """Run a message-batch iterator through process + bulk-store stages.
+
+        A producer walks each fetched page with a plain for loop —
+        suspending only when the queue is actually full — a pool of
+        workers runs middleware.process_message concurrently, and a
+        flusher drains the processed rows into bulk upserts. Telethon
+        fetches, message processing and SQLite commits overlap instead
+        of serializing per message; upserts are keyed by primary key, so
+        worker reordering is harmless.
+
+        Args:
+            batches: Async iterator of raw Telegram message pages
+            chat_title: Chat title, for progress logging
+            fast: Use the relaxed-durability bulk loader, for full syncs
+                that can simply be re-run after a crash
+
+        Returns:
+            int: Number of rows written
+        """
+        in_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        out_q: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
         count = 0
-        async for message in self.client.iter_all_messages(dialog.entity, limit=msg_limit):
-            msg_info = await self.middleware.process_message(message)
-            if msg_info:
-                self.message_repo.store_message(
-                    message_id=msg_info["id"],
-                    chat_id=msg_info["chat_id"],
-                    sender_id=msg_info["sender_id"],
-                    sender_name=msg_info["sender_name"],
-                    content=msg_info["content"],
-                    timestamp=msg_info["timestamp"],
-                    is_from_me=msg_info["is_from_me"],
-                    has_media=msg_info.get("has_media", False),
-                    media_type=msg_info.get("media_type"),
-                    file_id=msg_info.get("file_id"),
-                    file_name=msg_info.get("file_name"),
-                    file_size=msg_info.get("file_size"),
-                    mime_type=msg_info.get("mime_type"),
-                )
-                count += 1
 
-            # Log progress for large syncs
-            if count % 500 == 0:
-                logger.info(f"Synced {count} messages from {chat_info['title']}...")
+        async def producer():
+            async for batch in batches:
+                for message in batch:
+                    # Synchronous fast path; await only under backpressure
+                    if in_q.full():
+                        await in_q.put(message)
+                    else:
+                        in_q.put_nowait(message)
+            for _ in range(PIPELINE_WORKERS):
+                await in_q.put(None)
+
+        loop = asyncio.get_running_loop()
+
+        async def worker():
+            while True:
+                message = await in_q.get()
+                if message is None:
+                    return
+                # Decode off-loop whenever no network fetch is needed;
+                # the async path (which also primes my_id and the sender
+                # cache) only runs on cache misses
+                if self.middleware.can_process_sync(message):
+                    msg_info = await loop.run_in_executor(
+                        self._cpu_pool, self.middleware.process_message_sync, message
+                    )
+                else:
+                    msg_info = await self.middleware.process_message(message)
+                if msg_info:
+                    await out_q.put(msg_info)
+
+        async def flusher():
+            nonlocal count
+            pending: List[MessageRow] = []
+            while True:
+                msg_info = await out_q.get()
+                if msg_info is None:
+                    break
+                pending.append(msg_info)
+                if len(pending) >= SYNC_FLUSH_SIZE:
+                    count += await self._flush_messages(pending, fast)
+                    pending = []
+                    logger.info(f"Synced {count} messages from {chat_title}...")
+            if pending:
+                count += await self._flush_messages(pending, fast)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(producer())
+            workers = [tg.create_task(worker()) for _ in range(PIPELINE_WORKERS)]
+
+            async def close_out():
+                await asyncio.gather(*workers)
+                await out_q.put(None)
+
+            tg.create_task(close_out())
+            tg.create_task(flusher())
+
+        return count
+
+    async def _flush_loop(self) -> None:
+        """Periodically write the live message buffer in micro-batches.
+
+        Even small batches amortize the commit cost that a write per
+        event would pay; the interval bounds how stale the store can be.
+        """
+        while True:
+            await asyncio.sleep(LIVE_FLUSH_INTERVAL)
+            try:
+                await self._drain_live_buffer()
+            except Exception as e:
+                logger.error(f"Error flushing live messages: {e}")
 
-        logger.info(f"Synced {count} messages from {chat_info['title']}")
+    async def _drain_live_buffer(self) -> None:
+        """Write up to LIVE_FLUSH_MAX buffered live messages."""
+        if not self._live_buf:
+            return
+        batch = []
+        while self._live_buf and len(batch) < LIVE_FLUSH_MAX:
+            batch.append(self._live_buf.popleft())
+        await self._flush_messages(batch)
+
+    async def _flush_messages(self, rows: List[MessageRow],
+                              fast: bool = False) -> int:
+        """Write a buffered batch without blocking the event loop.
+
+        Returns:
+            int: Number of rows written
+        """
+        store = (self.message_repo.store_messages_bulk_fast if fast
+                 else self.message_repo.store_messages_bulk)
+        return await asyncio.to_thread(store, rows)
         
     async def send_message(self, recipient: str, message: str) -> Tuple[bool, str]:
         """Send a message to a Telegram recipient.
@@ -243,23 +427,9 @@ class TelegramService:
         """
         if not self.client.client.is_connected():
             return False, "Not connected to Telegram"
-            
-        entity = await self.middleware.find_entity_by_name_or_id(recipient)
-        
-        if not entity:
-            # Try to find in database
-            try:
-                # Try to parse as integer
-                chat_id = int(recipient)
-                chat = self.chat_repo.get_chat_by_id(chat_id)
-                if chat:
-                    entity = await self.client.get_entity(chat_id)
-            except ValueError:
-                # Not an integer, try to find by name
-                chats = self.chat_repo.get_chats(query=recipient, limit=1)
-                if chats:
-                    entity = await self.client.get_entity(chats[0].id)
-                    
+
+        entity = await self._resolve_recipient(recipient)
+
         if not entity:
             return False, f"Recipient not found: {recipient}"
             
@@ -271,64 +441,131 @@ class TelegramService:
             msg_info = await self.middleware.process_message(sent_message)
             if msg_info:
                 self.message_repo.store_message(
-                    message_id=msg_info["id"],
-                    chat_id=msg_info["chat_id"],
-                    sender_id=msg_info["sender_id"],
-                    sender_name=msg_info["sender_name"],
-                    content=msg_info["content"],
-                    timestamp=msg_info["timestamp"],
-                    is_from_me=msg_info["is_from_me"]
+                    message_id=msg_info.id,
+                    chat_id=msg_info.chat_id,
+                    sender_id=msg_info.sender_id,
+                    sender_name=msg_info.sender_name,
+                    content=msg_info.content,
+                    timestamp=msg_info.timestamp,
+                    is_from_me=msg_info.is_from_me
                 )
             return True, f"Message sent to {recipient}"
         else:
             return False, f"Failed to send message to {recipient}"
             
+    async def _resolve_recipient(self, recipient: str):
+        """Resolve a recipient identifier to a Telegram entity, cache-first.
+
+        Steady-state sends hit the LRU and make no Telegram or DB calls
+        at all; misses fall through Telegram lookup, then the local chat
+        store, and successful resolutions are cached by the exact
+        identifier string.
+
+        Returns:
+            The Telegram entity, or None if resolution fails
+        """
+        entity = self._recipient_cache.get(recipient)
+        if entity is not None:
+            self._recipient_cache.move_to_end(recipient)
+            return entity
+
+        entity = await self.middleware.find_entity_by_name_or_id(recipient)
+
+        if not entity:
+            # Try to find in database
+            try:
+                # Try to parse as integer
+                chat_id = int(recipient)
+                chat = self.chat_repo.get_chat_by_id(chat_id)
+                if chat:
+                    entity = await self._get_entity_cached(chat_id)
+            except ValueError:
+                # Not an integer, try to find by name
+                chats = self.chat_repo.get_chats(query=recipient, limit=1)
+                if chats:
+                    entity = await self._get_entity_cached(chats[0].id)
+
+        if entity is not None:
+            self._recipient_cache[recipient] = entity
+            if len(self._recipient_cache) > RECIPIENT_CACHE_SIZE:
+                self._recipient_cache.popitem(last=False)
+
+        return entity
+
+    async def _get_entity_cached(self, chat_id: int):
+        """Resolve a chat entity, reusing previously resolved ones.
+
+        Returns:
+            The Telegram entity, or None if resolution fails
+        """
+        entity = self._entity_cache.get(chat_id)
+        if entity is not None:
+            self._entity_cache.move_to_end(chat_id)
+            return entity
+
+        entity = await self.client.get_entity(chat_id)
+        if entity is not None:
+            self._entity_cache[chat_id] = entity
+            if len(self._entity_cache) > ENTITY_CACHE_SIZE:
+                self._entity_cache.popitem(last=False)
+        return entity
+
     async def _handle_new_message(self, event) -> None:
         """Handle a new message event from Telegram."""
         message = event.message
         msg_info = await self.middleware.process_message(message)
 
         if msg_info:
-            # Process and store chat information
+            # Process and store chat information. Metadata changes
+            # rarely, so the upsert is skipped while the chat's tuple is
+            # unchanged within the current minute; the bucket roll still
+            # refreshes last_message_time once a minute on busy chats.
             chat_entity = message.chat
             if chat_entity:
-                chat_info = await self.middleware.process_chat_entity(chat_entity)
-                self.chat_repo.store_chat(
-                    chat_id=chat_info["id"],
-                    title=chat_info["title"],
-                    username=chat_info.get("username"),
-                    chat_type=chat_info["type"],
-                    last_message_time=message.date
-                )
-
-            # Store the message
-            self.message_repo.store_message(
-                message_id=msg_info["id"],
-                chat_id=msg_info["chat_id"],
-                sender_id=msg_info["sender_id"],
-                sender_name=msg_info["sender_name"],
-                content=msg_info["content"],
-                timestamp=msg_info["timestamp"],
-                is_from_me=msg_info["is_from_me"],
-                has_media=msg_info.get("has_media", False),
-                media_type=msg_info.get("media_type"),
-                file_id=msg_info.get("file_id"),
-                file_name=msg_info.get("file_name"),
-                file_size=msg_info.get("file_size"),
-                mime_type=msg_info.get("mime_type"),
-            )
-
-            content_preview = msg_info['content'][:30] if msg_info['content'] else "[media]"
+                # Reuse the processed chat info for a while instead of
+                # rebuilding it on every event in the same chat
+                now = time.monotonic()
+                cached = self._chat_info_cache.get(chat_entity.id)
+                if cached is not None and now - cached[0] < CHAT_INFO_TTL:
+                    chat_info = cached[1]
+                else:
+                    chat_info = self.middleware.process_chat_entity(chat_entity)
+                    self._chat_info_cache[chat_entity.id] = (now, chat_info)
+                chat_id = chat_info["id"]
+                bucket = message.date.replace(second=0, microsecond=0) if message.date else None
+                key = (chat_info["title"], chat_info.get("username"),
+                       chat_info["type"], bucket)
+                if self._chat_cache.get(chat_id) != key:
+                    self.chat_repo.store_chat(
+                        chat_id=chat_id,
+                        title=chat_info["title"],
+                        username=chat_info.get("username"),
+                        chat_type=chat_info["type"],
+                        last_message_time=message.date
+                    )
+                    self._chat_cache[chat_id] = key
+                self._chat_cache.move_to_end(chat_id)
+                if len(self._chat_cache) > CHAT_CACHE_SIZE:
+                    self._chat_cache.popitem(last=False)
+
+            # Buffer the message for the next micro-batch flush; the
+            # handler itself stays free of DB round trips
+            self._live_buf.append(msg_info)
+            if len(self._live_buf) >= LIVE_FLUSH_ROWS:
+                await self._drain_live_buffer()
+
+            content_preview = msg_info.content[:30] if msg_info.content else "[media]"
             logger.info(
-                f"Stored message: [{msg_info['timestamp']}] {msg_info['sender_name']} "
-                f"in {msg_info['chat_title']}: {content_preview}..."
+                f"Stored message: [{msg_info.timestamp}] {msg_info.sender_name} "
+                f"in {msg_info.chat_title}: {content_preview}..."
             )
 
     async def download_media(
         self,
         message_id: int,
         chat_id: int,
-        download_dir: Optional[str] = None
+        download_dir: Optional[str] = None,
+        record_path: bool = True
     ) -> Tuple[bool, str, Optional[str]]:
         """Download media from a message.
 
@@ -336,6 +573,9 @@ class TelegramService:
             message_id: The message ID containing the media
             chat_id: The chat ID where the message is located
             download_dir: Optional custom download directory
+            record_path: Write the local path to the DB immediately;
+                download_media_many passes False and records all paths
+                in one bulk UPDATE instead
 
         Returns:
             Tuple[bool, str, Optional[str]]: (success, status_message, local_path)
@@ -356,9 +596,9 @@ class TelegramService:
             return True, "Media already downloaded", db_message.local_path
 
         try:
-            # Get the actual message from Telegram
-            entity = await self.client.get_entity(chat_id)
-            messages = await self.client.get_messages(entity, ids=[message_id])
+            # Get the actual message from Telegram in one round trip;
+            # Telethon resolves the bare chat_id from its entity cache
+            messages = await self.client.get_messages(chat_id, ids=[message_id])
 
             if not messages or not messages[0]:
                 return False, "Could not fetch message from Telegram", None
@@ -384,7 +624,10 @@ class TelegramService:
 
             if downloaded_path:
                 # Update database with local path
-                self.message_repo.update_local_path(message_id, chat_id, downloaded_path)
+                if record_path:
+                    self.message_repo.update_local_path(
+                        message_id, chat_id, downloaded_path
+                    )
                 return True, f"Downloaded to {downloaded_path}", downloaded_path
             else:
                 return False, "Download failed", None
@@ -393,6 +636,56 @@ class TelegramService:
             logger.error(f"Error downloading media: {e}")
             return False, f"Download error: {str(e)}", None
 
+    async def download_media_many(
+        self,
+        refs: List[Tuple[int, int]],
+        concurrency: int = DOWNLOAD_CONCURRENCY,
+        download_dir: Optional[str] = None
+    ) -> List[Tuple[bool, str, Optional[str]]]:
+        """Download media from several messages concurrently.
+
+        Transfers overlap up to the concurrency bound instead of paying
+        one full DC round trip after another; a failure in one download
+        is returned in place rather than cancelling the rest. Local
+        paths are recorded in one bulk UPDATE at the end rather than one
+        commit per finished file.
+
+        Args:
+            refs: (message_id, chat_id) pairs to download
+            concurrency: Maximum downloads in flight at once
+            download_dir: Optional custom download directory
+
+        Returns:
+            One (success, status_message, local_path) per ref, in order
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(message_id: int, chat_id: int):
+            async with sem:
+                return await self.download_media(
+                    message_id, chat_id, download_dir, record_path=False
+                )
+
+        results = await asyncio.gather(
+            *(_one(mid, cid) for mid, cid in refs), return_exceptions=True
+        )
+        out = [
+            (False, f"Download error: {r}", None) if isinstance(r, BaseException) else r
+            for r in results
+        ]
+
+        downloaded = [
+            (mid, cid, path)
+            for (mid, cid), (success, _, path) in zip(refs, out)
+            if success and path
+        ]
+        if downloaded:
+            await asyncio.to_thread(
+                self.message_repo.update_local_paths_bulk, downloaded
+            )
+
+        return out
+
     async def get_attachments(
         self,
         chat_id: Optional[int] = None,
@@ -409,26 +702,37 @@ class TelegramService:
         Returns:
             List of attachment information dictionaries
         """
-        messages = self.message_repo.get_messages_with_media(
+        # Rows come from the repository already shaped for the response;
+        # only is_downloaded needs computing here
+        rows = self.message_repo.get_attachments_as_dicts(
             chat_id=chat_id,
             media_type=media_type,
             limit=limit
         )
 
-        result = []
-        for msg in messages:
-            result.append({
-                "message_id": msg.id,
-                "chat_id": msg.chat_id,
-                "sender_name": msg.sender_name,
-                "timestamp": msg.timestamp,
-                "content": msg.content,
-                "media_type": msg.media_type,
-                "file_name": msg.file_name,
-                "file_size": msg.file_size,
-                "mime_type": msg.mime_type,
-                "is_downloaded": bool(msg.local_path and os.path.exists(msg.local_path)),
-                "local_path": msg.local_path,
-            })
-
-        return result
\ No newline at end of file
+        # One directory scan replaces a stat syscall per row; paths
+        # outside the store directory still fall back to os.path.exists
+        existing = self._downloaded_set()
+        store_prefix = DOWNLOAD_DIR + os.sep
+
+        for row in rows:
+            local_path = row["local_path"]
+            if local_path and local_path.startswith(store_prefix):
+                row["is_downloaded"] = local_path in existing
+            else:
+                row["is_downloaded"] = bool(local_path and os.path.exists(local_path))
+
+        return rows
+
+    def _downloaded_set(self) -> set:
+        """File paths under DOWNLOAD_DIR, cached briefly between calls."""
+        now = time.monotonic()
+        if now - self._downloaded_scan_time > DOWNLOAD_SCAN_TTL:
+            paths = set()
+            if os.path.isdir(DOWNLOAD_DIR):
+                for root, _dirs, files in os.walk(DOWNLOAD_DIR):
+                    for name in files:
+                        paths.add(os.path.join(root, name))
+            self._downloaded_paths = paths
+            self._downloaded_scan_time = now
+        return self._downloaded_paths
\ No newline at end of file